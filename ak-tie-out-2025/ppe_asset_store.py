@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+PPE Asset Drill-Down Store
+
+What it does
+- Loads the K02 additions/disposals detail, the K01 rollforward lines and the K03 account
+  totals (parsed by ppe_tie_out.py) into one local SQLite file, once
+- Indexes the asset rows on Asset A/C#, Date Acq, disposal status and cost
+- Answers "which assets make up this variance?" for any account and tie-out column
+  (additions or disposals) and exports the list as a support schedule CSV
+
+K03 is the summary (account totals) report, so K03 is stored per account; asset-level rows
+come from the K02 detail. Source workbooks are fingerprinted and only reloaded when they change.
+
+Typical use:
+    python ppe_asset_store.py load
+    python ppe_asset_store.py variance 15130 disposals --out 15130_disposals_support.csv
+    python ppe_asset_store.py assets --account 15070 --source additions --from 2025-07-01 --min-cost 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+import pandas as pd
+
+from ppe_tie_out import (
+    CIP,
+    DEFAULT_K01,
+    DEFAULT_K02_ADD,
+    DEFAULT_K02_DISP,
+    DEFAULT_K03,
+    HERE,
+    parse_k01,
+    parse_k02,
+    parse_k03,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    name TEXT PRIMARY KEY, path TEXT, sha256 TEXT, rows INTEGER, loaded_at TEXT);
+CREATE TABLE IF NOT EXISTS k02_assets (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,              -- 'additions' or 'disposals' report
+    account TEXT NOT NULL,
+    account_description TEXT,
+    date_acq TEXT,                     -- ISO dates
+    date_sold TEXT,
+    description TEXT,
+    status TEXT,
+    disposed INTEGER NOT NULL,
+    method TEXT,
+    life REAL,
+    cost_cents INTEGER,
+    section_179_cents INTEGER,
+    selling_price_cents INTEGER,
+    gain_loss_cents INTEGER);
+CREATE INDEX IF NOT EXISTS idx_k02_account ON k02_assets (account, source, disposed, cost_cents);
+CREATE INDEX IF NOT EXISTS idx_k02_date_acq ON k02_assets (date_acq, account);
+CREATE INDEX IF NOT EXISTS idx_k02_disposed ON k02_assets (disposed, date_sold);
+CREATE INDEX IF NOT EXISTS idx_k02_cost ON k02_assets (cost_cents);
+CREATE TABLE IF NOT EXISTS k01_lines (
+    section TEXT, account TEXT, cost_account TEXT, asset_class TEXT,
+    beginning_cents INTEGER, additions_cents INTEGER, disposals_cents INTEGER, transfers_cents INTEGER,
+    other_adjustments_cents INTEGER, fx_cents INTEGER, ending_cents INTEGER,
+    PRIMARY KEY (section, account));
+CREATE TABLE IF NOT EXISTS k03_accounts (
+    account TEXT PRIMARY KEY, description TEXT, asset_count INTEGER,
+    cost_cents INTEGER, depr_ytd_cents INTEGER, depr_to_date_cents INTEGER, net_book_value_cents INTEGER);
+"""
+
+ASSET_COLUMNS = ("id", "source", "account", "account_description", "date_acq", "date_sold", "description",
+                 "status", "disposed", "method", "life", "cost_cents", "section_179_cents",
+                 "selling_price_cents", "gain_loss_cents")
+MONEY_COLUMNS = ("cost", "section_179", "selling_price", "gain_loss")
+
+# Tie-out column -> (K02 filter, K01 comparator SQL, description); mirrors ppe_tie_out.build_tie_out.
+VARIANCES = {
+    "additions": ("source = 'additions'", "additions_cents + transfers_cents", "K02 acquisitions vs K01 Additions + Transfers"),
+    "disposals": ("source = 'disposals' AND disposed = 1", "ABS(disposals_cents)", "K02 disposals vs ABS(K01 Disposals)"),
+}
+
+
+def _cents(values: pd.Series) -> pd.Series:
+    """Money to integer cents via Decimal (float * 100 can land a cent off)."""
+    return values.map(lambda v: None if pd.isna(v) else int(Decimal(str(v)).quantize(Decimal("0.01")) * 100))
+
+
+def _iso(values: pd.Series) -> pd.Series:
+    return values.map(lambda v: None if pd.isna(v) else v.date().isoformat())
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _money(cents: int | None) -> str:
+    return "" if cents is None else f"{Decimal(cents) / 100:.2f}"
+
+
+class AssetStore:
+    """One SQLite connection over the loaded K01/K02/K03 data."""
+
+    def __init__(self, db_file: str | Path = "ppe_assets.db") -> None:
+        self.conn = sqlite3.connect(db_file)
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def load(self, paths: dict[str, Path], force: bool = False) -> dict[str, int]:
+        """
+        Load the source workbooks; unchanged files (same SHA-256) are skipped.
+
+        Args:
+            paths: {"k01", "k02_add", "k02_disp", "k03"} -> workbook path
+            force: Reload even if the files are unchanged
+
+        Returns:
+            Dict of source name -> rows loaded this call (skipped sources are omitted)
+        """
+        known = dict(self.conn.execute("SELECT name, sha256 FROM sources"))
+        loaded = {}
+        with self.conn:
+            for name, path in paths.items():
+                sha = file_sha256(path)
+                if not force and known.get(name) == sha:
+                    continue
+                raw = pd.read_excel(path, header=None)
+                if name == "k01":
+                    rows = self._load_k01(parse_k01(raw))
+                elif name == "k03":
+                    rows = self._load_k03(parse_k03(raw))
+                else:
+                    detail, _ = parse_k02(raw)
+                    rows = self._load_k02("additions" if name == "k02_add" else "disposals", detail)
+                self.conn.execute("INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?)",
+                                  (name, str(path), sha, rows, datetime.now().isoformat(timespec="seconds")))
+                loaded[name] = rows
+        if loaded:
+            self.conn.execute("ANALYZE")
+        return loaded
+
+    def _load_k02(self, source: str, detail: pd.DataFrame) -> int:
+        frame = pd.DataFrame({
+            "source": source,
+            "account": detail["account"],
+            "account_description": detail["account_description"],
+            "date_acq": _iso(detail["date_acq"]),
+            "date_sold": _iso(detail["date_sold"]),
+            "description": detail["description"].astype(str).str.strip(),
+            "status": detail["status"],
+            "disposed": detail["disposed"].astype(int),
+            "method": detail["method"],
+            "life": detail["life"],
+            **{f"{c}_cents": _cents(detail[c]) for c in MONEY_COLUMNS},
+        })
+        frame = frame.astype(object).where(frame.notna(), None)
+        self.conn.execute("DELETE FROM k02_assets WHERE source = ?", (source,))
+        columns = ", ".join(frame.columns)
+        self.conn.executemany(f"INSERT INTO k02_assets ({columns}) VALUES ({', '.join('?' * len(frame.columns))})",
+                              frame.itertuples(index=False, name=None))
+        return len(frame)
+
+    def _load_k01(self, k01: pd.DataFrame) -> int:
+        values = ["beginning", "additions", "disposals", "transfers", "other_adjustments", "fx", "ending"]
+        frame = k01[["section", "account", "cost_account", "asset_class"]].copy()
+        for column in values:
+            frame[f"{column}_cents"] = _cents(k01[column])
+        self.conn.execute("DELETE FROM k01_lines")
+        self.conn.executemany(f"INSERT INTO k01_lines VALUES ({', '.join('?' * len(frame.columns))})",
+                              frame.itertuples(index=False, name=None))
+        return len(frame)
+
+    def _load_k03(self, k03: pd.DataFrame) -> int:
+        frame = k03[["account", "description", "asset_count"]].astype(object)
+        for column in ("cost", "depr_ytd", "depr_to_date", "net_book_value"):
+            frame[f"{column}_cents"] = _cents(k03[column])
+        frame = frame.where(frame.notna(), None)
+        self.conn.execute("DELETE FROM k03_accounts")
+        self.conn.executemany(f"INSERT INTO k03_accounts VALUES ({', '.join('?' * len(frame.columns))})",
+                              frame.itertuples(index=False, name=None))
+        return len(frame)
+
+    def assets(
+        self,
+        account: str | None = None,
+        source: str | None = None,
+        disposed: bool | None = None,
+        date_from: str | None = None,
+        date_to: str | None = None,
+        min_cost: Decimal | None = None,
+        max_cost: Decimal | None = None,
+    ) -> list[tuple]:
+        """Asset rows matching every given filter (Date Acq bounds inclusive, cost in dollars), largest cost first."""
+        where, params = [], []
+        for clause, value in (
+            ("account = ?", account),
+            ("source = ?", source),
+            ("disposed = ?", None if disposed is None else int(disposed)),
+            ("date_acq >= ?", date_from),
+            ("date_acq <= ?", date_to),
+            ("cost_cents >= ?", None if min_cost is None else int(Decimal(min_cost) * 100)),
+            ("cost_cents <= ?", None if max_cost is None else int(Decimal(max_cost) * 100)),
+        ):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        sql = f"SELECT {', '.join(ASSET_COLUMNS)} FROM k02_assets"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return self.conn.execute(sql + " ORDER BY cost_cents DESC, id", params).fetchall()
+
+    def variance(self, account: str, column: str) -> tuple[dict, list[tuple]]:
+        """
+        Return (summary, assets) for one account and tie-out column ("additions" or "disposals").
+
+        summary holds the K02 total, the K01 comparator and the variance in cents; assets are the
+        K02 rows that make up the K02 side, largest first.
+        """
+        if column not in VARIANCES:
+            raise ValueError(f"Unknown tie-out column: {column!r} (expected one of {', '.join(VARIANCES)})")
+        if account.upper() == CIP:
+            raise ValueError("CIP has no K02 detail; it is tied out on the K01 rollforward only")
+        k02_filter, k01_sql, description = VARIANCES[column]
+        assets = self.conn.execute(
+            f"SELECT {', '.join(ASSET_COLUMNS)} FROM k02_assets INDEXED BY idx_k02_account "
+            f"WHERE account = ? AND {k02_filter} ORDER BY cost_cents DESC, id", (account,)).fetchall()
+        k01 = self.conn.execute(
+            f"SELECT asset_class, {k01_sql} FROM k01_lines WHERE section = 'cost' AND account = ?",
+            (account,)).fetchone()
+        k02_cents = sum(row[ASSET_COLUMNS.index("cost_cents")] or 0 for row in assets)
+        k01_cents = k01[1] if k01 else 0
+        summary = {
+            "account": account,
+            "asset_class": k01[0] if k01 else None,
+            "column": column,
+            "description": description,
+            "assets": len(assets),
+            "k02_cents": k02_cents,
+            "k01_cents": k01_cents,
+            "variance_cents": k02_cents - k01_cents,
+        }
+        return summary, assets
+
+
+def write_assets(rows: list[tuple], out) -> None:
+    writer = csv.writer(out)
+    writer.writerow([c.removesuffix("_cents") for c in ASSET_COLUMNS])
+    money = {i for i, c in enumerate(ASSET_COLUMNS) if c.endswith("_cents")}
+    for row in rows:
+        writer.writerow([_money(v) if i in money else v for i, v in enumerate(row)])
+
+
+def write_support_schedule(summary: dict, assets: list[tuple], out) -> None:
+    """Asset list followed by a total line and the reconciliation to K01."""
+    write_assets(assets, out)
+    writer = csv.writer(out)
+    writer.writerow([])
+    writer.writerow([f"Support: {summary['account']} {summary['asset_class'] or ''} - {summary['description']}"])
+    writer.writerow(["K02 total", _money(summary["k02_cents"]), f"{summary['assets']} assets"])
+    writer.writerow(["K01", _money(summary["k01_cents"])])
+    writer.writerow(["Variance (K02 - K01)", _money(summary["variance_cents"])])
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Load PPE activity detail into SQLite and drill into tie-out variances.")
+    p.add_argument("--db", default="ppe_assets.db", help="SQLite store (default: ppe_assets.db)")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    load = sub.add_parser("load", help="Load (or refresh) the K01/K02/K03 workbooks")
+    load.add_argument("--k01", default=str(HERE / DEFAULT_K01), help="K01 PPE rollforward workbook.")
+    load.add_argument("--k02-add", default=str(HERE / DEFAULT_K02_ADD), help="K02 additions detail workbook.")
+    load.add_argument("--k02-disp", default=str(HERE / DEFAULT_K02_DISP), help="K02 disposals detail workbook.")
+    load.add_argument("--k03", default=str(HERE / DEFAULT_K03), help="K03 subledger summary workbook.")
+    load.add_argument("--force", action="store_true", help="Reload even if the workbooks are unchanged")
+
+    variance = sub.add_parser("variance", help="Assets behind one account/column variance, as a support schedule")
+    variance.add_argument("account", help="Asset A/C#, e.g. 15130")
+    variance.add_argument("column", choices=sorted(VARIANCES), help="Tie-out column")
+    variance.add_argument("--out", help="Support schedule CSV (default: stdout)")
+
+    assets = sub.add_parser("assets", help="Filter asset rows")
+    assets.add_argument("--account", help="Asset A/C#")
+    assets.add_argument("--source", choices=("additions", "disposals"), help="K02 report")
+    assets.add_argument("--disposed", action="store_true", default=None, help="Disposed assets only")
+    assets.add_argument("--from", dest="date_from", help="Date Acq on or after, YYYY-MM-DD")
+    assets.add_argument("--to", dest="date_to", help="Date Acq on or before, YYYY-MM-DD")
+    assets.add_argument("--min-cost", type=Decimal, help="Minimum cost")
+    assets.add_argument("--max-cost", type=Decimal, help="Maximum cost")
+    assets.add_argument("--out", help="Output CSV (default: stdout)")
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    store = AssetStore(args.db)
+    try:
+        if args.command == "load":
+            paths = {name: Path(getattr(args, name)).expanduser().resolve()
+                     for name in ("k01", "k02_add", "k02_disp", "k03")}
+            for name, path in paths.items():
+                if not path.exists():
+                    raise FileNotFoundError(f"{name.upper()} file not found: {path}")
+            start = time.perf_counter()
+            loaded = store.load(paths, force=args.force)
+            for name, rows in loaded.items():
+                print(f"Loaded {rows:>5} rows  {paths[name].name}")
+            print(f"{'Nothing changed' if not loaded else 'Done'} in {time.perf_counter() - start:.2f}s -> {args.db}")
+            return 0
+
+        start = time.perf_counter()
+        if args.command == "variance":
+            summary, rows = store.variance(args.account, args.column)
+        else:
+            rows = store.assets(args.account, args.source, args.disposed, args.date_from, args.date_to,
+                                args.min_cost, args.max_cost)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if args.out:
+            with open(args.out, "w", newline="", encoding="utf-8") as f:
+                if args.command == "variance":
+                    write_support_schedule(summary, rows, f)
+                else:
+                    write_assets(rows, f)
+        elif args.command == "variance":
+            write_support_schedule(summary, rows, sys.stdout)
+        else:
+            write_assets(rows, sys.stdout)
+        print(f"{len(rows)} assets in {elapsed_ms:.1f} ms" + (f" -> {args.out}" if args.out else ""), file=sys.stderr)
+        return 0
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+PPE Rollforward Tie-Out (K01 vs K02 vs K03)
+
+What it does
+- Reads the K01 rollforward, the K02 additions and disposals detail (Activity by Year
+  reports) and the K03 subledger summary (Monthly Abbreviated report)
+- Aggregates K02 detail and K03 totals by Asset A/C# (vectorized groupbys, no row loops)
+- Applies the tie-out rules from ak-tie-out-2025-report-discrepancies.md:
+    * K01 ending cost / A/D vs K03 Cost / "To Date" (A/D accounts 16xxx map to cost 15xxx)
+    * K02 acquisitions vs K01 (Additions + Transfers)
+    * K02 disposals (positive) vs ABS(K01 Disposals) (negative on the rollforward)
+    * CIP is its own bucket (K01 only), rolled forward and checked separately
+- Checks K02 detail against the report's own "Totals for Asset A/C#" lines
+- Prints the variance summary and writes one Excel workpaper
+
+Typical use (run from anywhere; defaults point at the YE 2025 files next to this script):
+    python ppe_tie_out.py
+
+Optional:
+    python ppe_tie_out.py --k01 "K01 ....xlsx" --k02-add "K02 ... Additions ....xlsx" \
+        --k02-disp "K02 ... Disposals ....xlsx" --k03 "K03 ....xlsx" --out "PPE_TieOut.xlsx" --tolerance 0.50
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+HERE = Path(__file__).resolve().parent
+
+DEFAULT_K01 = "K01 - PPE Rollforward YE 2025.1.xlsx"
+DEFAULT_K02_ADD = "K02 - PPE Additions Detail - CSV_AK_Activity_By_Year_Report Additions Detail YE 12.31.2025.xlsx"
+DEFAULT_K02_DISP = ("K02 - PPE Disposals Detail - CityServiceValcon_Activity_By_Year_Report "
+                    "Disposals Detail YE 12.31.2025.xlsx")
+DEFAULT_K03 = "K03 - PPE Subledger - CSV_Monthly_Abbreviated_Report_ AK All Assets Summary YTD 12.31.2025.xlsx"
+
+CIP = "CIP"
+
+# K01 value columns sit in every other sheet column (the blank columns in between are spacers).
+K01_COLUMNS = {
+    0: "asset_class",
+    1: "gl_account",
+    2: "beginning",
+    4: "additions",
+    6: "disposals",
+    8: "transfers",
+    10: "other_adjustments",
+    12: "fx",
+    14: "ending",
+}
+
+K02_COLUMNS = {
+    0: "flag",
+    1: "date_acq",
+    2: "date_sold",
+    3: "description",
+    4: "status",
+    5: "method",
+    6: "life",
+    7: "cost",
+    8: "section_179",
+    9: "selling_price",
+    10: "gain_loss",
+}
+
+K03_COLUMNS = {6: "cost", 7: "depr_ytd", 8: "depr_to_date", 9: "net_book_value"}
+
+ACCOUNT_RE = r"Asset A/C#:\s*(?P<account>\d+)\s*-\s*(?P<description>.+?)\s*$"
+K02_TOTALS_RE = r"^Totals for Asset A/C#:\s*(?P<account>\d+)"
+K03_TOTALS_RE = (r"Asset A/C# totals:\s*(?P<account>\d+)\s*-\s*(?P<description>.+?)\s*"
+                 r"\(\s*(?P<asset_count>[\d,]+)\s+assets?\s*\)")
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Tie out the PPE rollforward (K01) to K02 activity and the K03 subledger.")
+    p.add_argument("--k01", default=str(HERE / DEFAULT_K01), help="K01 PPE rollforward workbook.")
+    p.add_argument("--k02-add", default=str(HERE / DEFAULT_K02_ADD), help="K02 additions detail workbook.")
+    p.add_argument("--k02-disp", default=str(HERE / DEFAULT_K02_DISP), help="K02 disposals detail workbook.")
+    p.add_argument("--k03", default=str(HERE / DEFAULT_K03), help="K03 subledger summary workbook.")
+    p.add_argument("--out", default="", help="Output Excel filename. Default: PPE_TieOut_Workpapers_YYYYMMDD.xlsx")
+    p.add_argument("--tolerance", type=float, default=0.50,
+                   help="Absolute variance treated as rounding noise (default: 0.50).")
+    return p.parse_args()
+
+
+def _amounts(df: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
+    df[columns] = df[columns].apply(pd.to_numeric, errors="coerce")
+    return df
+
+
+def parse_k01(raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return one row per K01 line: section ("cost" or "ad"), account, asset class and the rollforward columns.
+
+    The sheet has a cost block and an A/D block, each starting with a "Fixed Asset Classes" header row.
+    Subtotal rows (no class name) are dropped; CIP (no GL account) gets account "CIP".
+    """
+    k01 = raw.reindex(columns=list(K01_COLUMNS)).rename(columns=K01_COLUMNS)
+    header = k01["asset_class"].astype(str).str.strip().eq("Fixed Asset Classes")
+    k01["section"] = np.where(header.cumsum() == 1, "cost", "ad")
+    k01 = k01[header.cumsum().gt(0) & ~header & k01["asset_class"].notna()].copy()
+    k01 = k01[~k01["asset_class"].astype(str).str.strip().eq("Net Book Value")]
+
+    k01["asset_class"] = k01["asset_class"].astype(str).str.strip()
+    k01["account"] = k01["gl_account"].astype(str).str.extract(r"^(\d{5})", expand=False)
+    k01.loc[k01["asset_class"].str.upper().eq(CIP), "account"] = CIP
+    k01 = k01[k01["account"].notna()]
+
+    # A/D accounts (16xxx) roll up to the cost account they depreciate (15xxx).
+    k01["cost_account"] = np.where(
+        k01["section"].eq("ad") & k01["account"].str.startswith("16"),
+        "15" + k01["account"].str[2:],
+        k01["account"],
+    )
+    value_columns = ["beginning", "additions", "disposals", "transfers", "other_adjustments", "fx", "ending"]
+    k01 = _amounts(k01, value_columns)
+    k01[value_columns] = k01[value_columns].fillna(0.0)
+    return k01[["section", "account", "cost_account", "asset_class", "gl_account"] + value_columns].reset_index(drop=True)
+
+
+def parse_k02(raw: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Return (detail, report_totals) from an Activity by Year export.
+
+    detail has one row per asset line, with the Asset A/C# forward-filled from the group header
+    rows and disposed lines flagged (the report marks them with "*"). report_totals holds the
+    report's own acquisitions/disposals totals per account, used as a control on the detail.
+    """
+    k02 = raw.reindex(columns=list(K02_COLUMNS)).rename(columns=K02_COLUMNS)
+    flag = k02["flag"].astype(str).str.strip()
+    date_acq = k02["date_acq"].astype(str)
+
+    group = date_acq.str.extract(ACCOUNT_RE)
+    k02["account"] = group["account"].ffill()
+    k02["account_description"] = group["description"].ffill()
+
+    totals_account = flag.str.extract(K02_TOTALS_RE, expand=False)
+    # Each "Totals for Asset A/C#" row (acquisitions) is followed by its disposals row.
+    totals_account = totals_account.ffill(limit=1)
+    label = k02["description"].astype(str).str.strip()
+    totals = k02[totals_account.notna() & label.isin(["Acquisitions", "Disposals *"])].copy()
+    totals["account"] = totals_account[totals.index]
+    totals["kind"] = np.where(label[totals.index].eq("Acquisitions"), "acquisitions", "disposals")
+    totals["asset_count"] = pd.to_numeric(
+        totals["status"].astype(str).str.extract(r"\(\s*([\d,]+)", expand=False).str.replace(",", ""),
+        errors="coerce",
+    )
+    totals = _amounts(totals, ["cost"])
+    report_totals = totals.pivot_table(index="account", columns="kind", values=["cost", "asset_count"], aggfunc="sum")
+    report_totals.columns = [f"report_{kind}_{value}" for value, kind in report_totals.columns]
+    report_totals = report_totals.reset_index()
+
+    dates = pd.to_datetime(k02["date_acq"], format="%m/%d/%Y", errors="coerce")
+    detail = k02[dates.notna() & k02["account"].notna()].copy()
+    detail["date_acq"] = dates[detail.index]
+    detail["date_sold"] = pd.to_datetime(detail["date_sold"], format="%m/%d/%Y", errors="coerce")
+    detail["disposed"] = flag[detail.index].eq("*")
+    detail = _amounts(detail, ["life", "cost", "section_179", "selling_price", "gain_loss"])
+    detail = detail.drop(columns="flag")
+    return detail.reset_index(drop=True), report_totals
+
+
+def parse_k03(raw: pd.DataFrame) -> pd.DataFrame:
+    """Return one row per Asset A/C# totals line of the K03 summary report."""
+    k03 = raw.reindex(columns=[0] + list(K03_COLUMNS))
+    found = k03[0].astype(str).str.extract(K03_TOTALS_RE)
+    k03 = pd.concat([found, k03[list(K03_COLUMNS)].rename(columns=K03_COLUMNS)], axis=1)
+    k03 = k03[k03["account"].notna()].copy()
+    k03["asset_count"] = pd.to_numeric(k03["asset_count"].str.replace(",", ""), errors="coerce").astype("Int64")
+    k03 = _amounts(k03, list(K03_COLUMNS.values()))
+    return k03.reset_index(drop=True)
+
+
+def _variance(df: pd.DataFrame, left: str, right: str, tolerance: float) -> pd.DataFrame:
+    df[[left, right]] = df[[left, right]].fillna(0.0)
+    df["variance"] = (df[left] - df[right]).round(2)
+    df["ties"] = df["variance"].abs() <= tolerance
+    return df
+
+
+def build_tie_out(
+    k01: pd.DataFrame,
+    additions: pd.DataFrame,
+    additions_totals: pd.DataFrame,
+    disposals: pd.DataFrame,
+    disposals_totals: pd.DataFrame,
+    k03: pd.DataFrame,
+    tolerance: float,
+) -> dict[str, pd.DataFrame]:
+    cost = k01[k01["section"].eq("cost") & k01["account"].ne(CIP)]
+    ad = k01[k01["section"].eq("ad")]
+    names = cost[["account", "asset_class"]]
+
+    # K01 vs K03: balances at year end
+    cost_tie = cost[["account", "asset_class", "ending"]].rename(columns={"ending": "k01_ending_cost"}).merge(
+        k03[["account", "asset_count", "cost"]].rename(columns={"cost": "k03_cost"}), on="account", how="outer")
+    cost_tie = _variance(cost_tie, "k01_ending_cost", "k03_cost", tolerance)
+
+    ad_tie = ad[["account", "cost_account", "asset_class", "additions", "ending"]].rename(
+        columns={"additions": "k01_depr_exp", "ending": "k01_ending_ad"})
+    # K01 carries A/D as negatives; K03 reports depreciation as positives.
+    ad_tie[["k01_depr_exp", "k01_ending_ad"]] = -ad_tie[["k01_depr_exp", "k01_ending_ad"]]
+    ad_tie = ad_tie.merge(
+        k03[["account", "depr_ytd", "depr_to_date"]].rename(
+            columns={"account": "cost_account", "depr_ytd": "k03_depr_ytd", "depr_to_date": "k03_depr_to_date"}),
+        on="cost_account", how="outer")
+    ad_tie = _variance(ad_tie, "k01_ending_ad", "k03_depr_to_date", tolerance)
+    ad_tie["depr_exp_variance"] = (ad_tie["k01_depr_exp"].fillna(0.0) - ad_tie["k03_depr_ytd"].fillna(0.0)).round(2)
+
+    # K02 vs K01: activity
+    k02_add = additions.groupby("account").agg(
+        k02_assets=("cost", "size"), k02_acquisitions=("cost", "sum")).reset_index()
+    add_tie = cost[["account", "asset_class", "additions", "transfers"]].rename(
+        columns={"additions": "k01_additions", "transfers": "k01_transfers"})
+    add_tie["k01_add_plus_xfer"] = add_tie["k01_additions"] + add_tie["k01_transfers"]
+    add_tie = k02_add.merge(add_tie, on="account", how="outer")
+    add_tie = _variance(add_tie, "k02_acquisitions", "k01_add_plus_xfer", tolerance)
+
+    disposed = disposals[disposals["disposed"]]
+    k02_disp = disposed.groupby("account").agg(
+        k02_assets=("cost", "size"), k02_disposals=("cost", "sum")).reset_index()
+    disp_tie = cost[["account", "asset_class", "disposals"]].rename(columns={"disposals": "k01_disposals_signed"})
+    disp_tie["abs_k01_disposals"] = disp_tie["k01_disposals_signed"].abs()
+    disp_tie = k02_disp.merge(disp_tie, on="account", how="outer")
+    disp_tie = _variance(disp_tie, "k02_disposals", "abs_k01_disposals", tolerance)
+
+    # CIP: its own bucket, K01 only; check that the line rolls forward.
+    cip = k01[k01["section"].eq("cost") & k01["account"].eq(CIP)].copy()
+    cip["computed_ending"] = cip[["beginning", "additions", "disposals", "transfers", "other_adjustments", "fx"]].sum(axis=1)
+    cip = _variance(cip, "ending", "computed_ending", tolerance)
+
+    # K02 detail vs the report's own totals lines
+    controls = pd.concat([
+        k02_add.merge(additions_totals[["account", "report_acquisitions_cost", "report_acquisitions_asset_count"]],
+                      on="account", how="outer")
+        .rename(columns={"k02_acquisitions": "detail_cost", "k02_assets": "detail_assets",
+                         "report_acquisitions_cost": "report_cost",
+                         "report_acquisitions_asset_count": "report_assets"})
+        .assign(report="additions"),
+        k02_disp.merge(disposals_totals[["account", "report_disposals_cost", "report_disposals_asset_count"]],
+                       on="account", how="outer")
+        .rename(columns={"k02_disposals": "detail_cost", "k02_assets": "detail_assets",
+                         "report_disposals_cost": "report_cost",
+                         "report_disposals_asset_count": "report_assets"})
+        .assign(report="disposals"),
+    ], ignore_index=True)
+    controls = _variance(controls, "detail_cost", "report_cost", tolerance)
+    controls["ties"] &= controls["detail_assets"].fillna(0).eq(controls["report_assets"].fillna(0))
+    controls = controls[["report", "account", "detail_assets", "report_assets", "detail_cost", "report_cost",
+                         "variance", "ties"]]
+
+    tables = {
+        "cost": cost_tie,
+        "ad": ad_tie,
+        "additions": add_tie,
+        "disposals": disp_tie,
+        "cip": cip,
+        "controls": controls,
+    }
+    for key in ("cost", "additions", "disposals"):
+        table = tables[key]
+        missing = table["asset_class"].isna()
+        table.loc[missing, "asset_class"] = table.loc[missing, "account"].map(names.set_index("account")["asset_class"])
+        tables[key] = table.sort_values("account", kind="mergesort").reset_index(drop=True)
+    tables["ad"] = tables["ad"].sort_values("cost_account", kind="mergesort").reset_index(drop=True)
+    return tables
+
+
+def summarize(tables: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    rows = []
+    for name, (left, right) in {
+        "cost": ("k01_ending_cost", "k03_cost"),
+        "ad": ("k01_ending_ad", "k03_depr_to_date"),
+        "additions": ("k02_acquisitions", "k01_add_plus_xfer"),
+        "disposals": ("k02_disposals", "abs_k01_disposals"),
+        "cip": ("ending", "computed_ending"),
+    }.items():
+        table = tables[name]
+        issues = table[~table["ties"]]
+        rows.append({
+            "tie_out": name,
+            "left": left,
+            "right": right,
+            "left_total": round(float(table[left].sum()), 2),
+            "right_total": round(float(table[right].sum()), 2),
+            "variance": round(float(table[left].sum() - table[right].sum()), 2),
+            "accounts_with_variance": int(len(issues)),
+            "accounts": ", ".join(issues.get("account", pd.Series(dtype=str)).astype(str)),
+        })
+    return pd.DataFrame(rows)
+
+
+def write_workpaper(out_path: Path, paths: dict[str, Path], summary: pd.DataFrame,
+                    tables: dict[str, pd.DataFrame], additions: pd.DataFrame, disposals: pd.DataFrame) -> None:
+    sources = pd.DataFrame([{"run_timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                             **{f"{name}_file": str(path) for name, path in paths.items()}}])
+    issues = pd.concat(
+        [table[~table["ties"]].assign(tie_out=name) for name, table in tables.items()],
+        ignore_index=True,
+    )
+    with pd.ExcelWriter(out_path, engine="openpyxl") as writer:
+        summary.to_excel(writer, sheet_name="Summary", index=False)
+        sources.to_excel(writer, sheet_name="Summary", index=False, startrow=len(summary) + 3)
+        tables["cost"].to_excel(writer, sheet_name="Cost_K01_vs_K03", index=False)
+        tables["ad"].to_excel(writer, sheet_name="AD_K01_vs_K03", index=False)
+        tables["additions"].to_excel(writer, sheet_name="Additions_K02_vs_K01", index=False)
+        tables["disposals"].to_excel(writer, sheet_name="Disposals_K02_vs_K01", index=False)
+        tables["cip"].to_excel(writer, sheet_name="CIP", index=False)
+        tables["controls"].to_excel(writer, sheet_name="K02_Controls", index=False)
+        issues.to_excel(writer, sheet_name="Issues", index=False)
+        additions.to_excel(writer, sheet_name="K02_Additions_Detail", index=False)
+        disposals.to_excel(writer, sheet_name="K02_Disposals_Detail", index=False)
+
+
+def main() -> int:
+    args = parse_args()
+    start = time.perf_counter()
+
+    paths = {
+        "k01": Path(args.k01).expanduser().resolve(),
+        "k02_add": Path(args.k02_add).expanduser().resolve(),
+        "k02_disp": Path(args.k02_disp).expanduser().resolve(),
+        "k03": Path(args.k03).expanduser().resolve(),
+    }
+    for name, path in paths.items():
+        if not path.exists():
+            raise FileNotFoundError(f"{name.upper()} file not found: {path}")
+
+    out_path = Path(args.out) if args.out else Path(f"PPE_TieOut_Workpapers_{datetime.now():%Y%m%d}.xlsx")
+    out_path = out_path.expanduser().resolve()
+
+    # Read
+    k01 = parse_k01(pd.read_excel(paths["k01"], header=None))
+    additions, additions_totals = parse_k02(pd.read_excel(paths["k02_add"], header=None))
+    disposals, disposals_totals = parse_k02(pd.read_excel(paths["k02_disp"], header=None))
+    k03 = parse_k03(pd.read_excel(paths["k03"], header=None))
+
+    print(f"K01 lines: {len(k01)}  K02 additions: {len(additions)} assets  "
+          f"K02 disposals: {int(disposals['disposed'].sum())} assets  K03 accounts: {len(k03)}")
+
+    tables = build_tie_out(k01, additions, additions_totals, disposals, disposals_totals, k03, args.tolerance)
+    summary = summarize(tables)
+
+    print()
+    for row in summary.itertuples(index=False):
+        print(f"{row.tie_out:<10} {row.left:>18} {row.left_total:>16,.2f}  {row.right:<18} {row.right_total:>16,.2f}"
+              f"  variance {row.variance:>14,.2f}")
+    for name in ("additions", "disposals"):
+        issues = tables[name][~tables[name]["ties"]]
+        if len(issues):
+            print(f"\n{name.title()} variances by account:")
+            for row in issues.itertuples(index=False):
+                print(f"  {row.account}  {str(row.asset_class):<28} {row.variance:>14,.2f}")
+    control_issues = tables["controls"][~tables["controls"]["ties"]]
+    print(f"\nK02 detail vs report totals: {'ok' if control_issues.empty else f'{len(control_issues)} mismatches'}")
+
+    write_workpaper(out_path, paths, summary, tables, additions, disposals)
+    print(f"Wrote workpaper: {out_path}  ({time.perf_counter() - start:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,12 +5,14 @@ Amortization table generator (fixed-rate, fully amortizing loan) with prompts.
 Outputs:
 - amortization_schedule.csv
 - amortization_schedule.xlsx (if openpyxl is installed)
+- amortization_simulation.csv (optional prepayment simulation, needs numpy)
 
 Prompts for:
 - principal
 - annual interest rate (percent)
 - term (months)
 - optional extra principal per payment
+- optional stochastic prepayment simulation (CPR/SMM, many paths, seeded)
 """
 
 from __future__ import annotations
@@ -18,7 +20,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from decimal import Decimal, ROUND_HALF_UP, getcontext
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 import csv
 
 try:
@@ -26,6 +28,11 @@ try:
 except ImportError:
     openpyxl = None
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 getcontext().prec = 28
 CENT = Decimal("0.01")
 
@@ -34,7 +41,7 @@ def money(x: Decimal) -> Decimal:
     return x.quantize(CENT, rounding=ROUND_HALF_UP)
 
 
-def parse_decimal(prompt: str, min_value: Decimal | None = None) -> Decimal:
+def parse_decimal(prompt: str, min_value: Decimal | None = None, max_value: Decimal | None = None) -> Decimal:
     while True:
         raw = input(prompt).strip().replace(",", "")
         try:
@@ -42,6 +49,9 @@ def parse_decimal(prompt: str, min_value: Decimal | None = None) -> Decimal:
             if min_value is not None and val < min_value:
                 print(f"Value must be >= {min_value}. Try again.")
                 continue
+            if max_value is not None and val > max_value:
+                print(f"Value must be <= {max_value}. Try again.")
+                continue
             return val
         except Exception:
             print("Invalid number. Try again (example: 100000 or 100000.00).")
@@ -81,6 +91,21 @@ class LoanInputs:
     extra_principal: Decimal    # e.g. 50.00
 
 
+@dataclass
+class PrepaymentInputs:
+    cpr: Decimal                # annual full-payoff rate, e.g. 0.06 for 6% CPR
+    partial_cpr: Decimal        # annual partial-prepayment rate, e.g. 0.10
+    partial_fraction: Decimal   # share of balance prepaid on a partial event, e.g. 0.10
+    paths: int = 5000
+    seed: Optional[int] = None
+    percentiles: Tuple[int, ...] = (5, 25, 50, 75, 95)
+
+
+def cpr_to_smm(cpr: Decimal) -> float:
+    """Convert an annual CPR to a single monthly mortality (SMM) probability."""
+    return 1.0 - (1.0 - float(cpr)) ** (1.0 / 12.0)
+
+
 def calc_monthly_payment(principal: Decimal, annual_rate: Decimal, term_months: int) -> Decimal:
     if term_months <= 0:
         raise ValueError("term_months must be > 0")
@@ -140,6 +165,82 @@ def build_schedule(inputs: LoanInputs) -> List[Dict[str, object]]:
     return rows
 
 
+def simulate_prepayments(inputs: LoanInputs, sim: PrepaymentInputs) -> List[Dict[str, object]]:
+    """
+    Monte Carlo prepayment simulation.
+
+    Every path starts from the same loan and pays the scheduled payment (plus
+    any fixed extra principal). After each payment a path fully pays off with
+    probability SMM(cpr), or prepays `partial_fraction` of its balance with
+    probability SMM(partial_cpr). All paths for a period are advanced together
+    as NumPy arrays; the only Python loop is over periods.
+
+    Returns one row per period with percentile bands for balance and
+    cumulative interest, plus the number of paths still outstanding.
+    """
+    if np is None:
+        raise RuntimeError("numpy is required for the prepayment simulation (pip install numpy)")
+    if sim.paths <= 0:
+        raise ValueError("paths must be > 0")
+    if not (0 <= sim.cpr < 1 and 0 <= sim.partial_cpr < 1):
+        raise ValueError("cpr and partial_cpr must be between 0 and 1")
+    if not 0 <= sim.partial_fraction <= 1:
+        raise ValueError("partial_fraction must be between 0 and 1")
+    if cpr_to_smm(sim.cpr) + cpr_to_smm(sim.partial_cpr) > 1:
+        raise ValueError("cpr and partial_cpr together imply a monthly prepayment probability above 100%")
+
+    base_payment = float(calc_monthly_payment(inputs.principal, inputs.annual_rate, inputs.term_months))
+    monthly_rate = float(inputs.annual_rate / Decimal("12"))
+    extra = float(inputs.extra_principal)
+    payoff_smm = cpr_to_smm(sim.cpr)
+    partial_smm = cpr_to_smm(sim.partial_cpr)
+    fraction = float(sim.partial_fraction)
+
+    rng = np.random.default_rng(sim.seed)
+    balance = np.full(sim.paths, float(inputs.principal))
+    cum_interest = np.zeros(sim.paths)
+    percentiles = list(sim.percentiles)
+
+    rows: List[Dict[str, object]] = []
+
+    for period in range(1, inputs.term_months + 1):
+        if not balance.any():
+            break
+
+        interest = np.round(balance * monthly_rate, 2)
+        scheduled_principal = base_payment - interest
+        if (scheduled_principal < 0).any():
+            raise ValueError("Payment is too small to cover interest. Check rate/term.")
+
+        # Prevent overpay (paid-off paths have balance 0 and stay at 0). The last
+        # period clears any cent residue left by per-path rounding differences.
+        if period == inputs.term_months:
+            total_principal = balance
+        else:
+            total_principal = np.minimum(scheduled_principal + extra, balance)
+        balance = np.round(balance - total_principal, 2)
+        cum_interest += interest
+
+        # One uniform draw per path decides full payoff, partial prepayment, or neither
+        draw = rng.random(sim.paths)
+        payoff = draw < payoff_smm
+        partial = ~payoff & (draw < payoff_smm + partial_smm)
+        prepay = np.where(payoff, balance, np.where(partial, np.round(balance * fraction, 2), 0.0))
+        balance = np.round(balance - prepay, 2)
+
+        balance_bands = np.percentile(balance, percentiles)
+        interest_bands = np.percentile(cum_interest, percentiles)
+
+        row: Dict[str, object] = {"Period": period, "ActivePaths": int(np.count_nonzero(balance))}
+        for p, value in zip(percentiles, balance_bands):
+            row[f"Balance_P{p}"] = round(float(value), 2)
+        for p, value in zip(percentiles, interest_bands):
+            row[f"CumInterest_P{p}"] = round(float(value), 2)
+        rows.append(row)
+
+    return rows
+
+
 def write_csv(rows: List[Dict[str, object]], out_path: Path) -> None:
     headers = list(rows[0].keys()) if rows else []
     with out_path.open("w", newline="", encoding="utf-8") as f:
@@ -169,7 +270,7 @@ def write_xlsx(rows: List[Dict[str, object]], out_path: Path) -> None:
     # Formatting
     currency_cols = {"Payment", "Interest", "Principal", "ExtraPrincipal", "TotalPrincipal", "Balance"}
     for col_idx, header in enumerate(headers, start=1):
-        if header in currency_cols:
+        if header in currency_cols or header.startswith(("Balance_", "CumInterest_")):
             for row_idx in range(2, ws.max_row + 1):
                 ws.cell(row=row_idx, column=col_idx).number_format = '"$"#,##0.00'
 
@@ -192,6 +293,52 @@ def prompt_inputs() -> LoanInputs:
     )
 
 
+def prompt_prepayment_inputs() -> PrepaymentInputs:
+    print("\n--- Prepayment Simulation Inputs ---")
+    max_rate = Decimal("99.99")
+    cpr_pct = parse_decimal("Annual full-payoff rate CPR % (e.g., 6): ",
+                            min_value=Decimal("0.00"), max_value=max_rate)
+    while True:
+        partial_pct = parse_decimal("Annual partial-prepayment rate % (e.g., 10): ",
+                                    min_value=Decimal("0.00"), max_value=max_rate)
+        # Full payoff and partial prepayment share one monthly draw, so their SMMs must fit in 100%
+        if cpr_to_smm(cpr_pct / Decimal("100")) + cpr_to_smm(partial_pct / Decimal("100")) <= 1:
+            break
+        print("Full-payoff and partial-prepayment rates together are too high. Try a lower rate.")
+    fraction_pct = parse_decimal("Share of balance prepaid on a partial event % (e.g., 10): ",
+                                 min_value=Decimal("0.00"), max_value=Decimal("100"))
+    paths = parse_int("Number of simulated paths (e.g., 5000): ", min_value=1)
+    seed = parse_int("Random seed (e.g., 42): ", min_value=0)
+
+    return PrepaymentInputs(
+        cpr=cpr_pct / Decimal("100"),
+        partial_cpr=partial_pct / Decimal("100"),
+        partial_fraction=fraction_pct / Decimal("100"),
+        paths=paths,
+        seed=seed,
+    )
+
+
+def run_simulation(inputs: LoanInputs, out_dir: Path) -> None:
+    if np is None:
+        print("numpy not installed; skipping prepayment simulation. Install it with: pip install numpy")
+        return
+
+    sim = prompt_prepayment_inputs()
+    sim_rows = simulate_prepayments(inputs, sim)
+
+    sim_path = out_dir / "amortization_simulation.csv"
+    write_csv(sim_rows, sim_path)
+    print(f"\nCreated: {sim_path.resolve()}")
+
+    if sim_rows:
+        mid = sim.percentiles[len(sim.percentiles) // 2]
+        last = sim_rows[-1]
+        print(f"Paths simulated: {sim.paths} (seed {sim.seed})")
+        print(f"Periods until all paths paid off: {last['Period']}")
+        print(f"Median (P{mid}) total interest: ${last[f'CumInterest_P{mid}']:,.2f}")
+
+
 def main() -> None:
     inputs = prompt_inputs()
 
@@ -226,6 +373,9 @@ def main() -> None:
     for r in rows[:show_n]:
         print(r)
 
+    if ask_yes_no("\nRun stochastic prepayment simulation?", default_yes=False):
+        run_simulation(inputs, out_dir)
+
 
 if __name__ == "__main__":
     main()
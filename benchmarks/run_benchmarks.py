@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""Performance regression benchmarks for the recon, amortization, SQLite loader and duplicate finder.
+
+Each benchmark runs one tool's main entry point on deterministic synthetic
+input (see synthetic.py) at several sizes. A benchmark is run once under
+tracemalloc to record the peak Python heap (py_heap_mb), then timed for
+--rounds rounds (fewer if --max-time runs out). The heap figure covers
+Python objects only: SQLite's page cache, memory-mapped files and other
+native allocations are not in it, so it is not the process's peak memory.
+Results are saved as JSON keyed by the git commit (results/<commit>.json,
+or <commit>-dirty.json with uncommitted changes; results/ is not tracked);
+re-running a subset merges into the existing file.
+
+baseline.json holds the results of a clean run that is committed with the
+code; `compare baseline` checks the current results against it. To refresh
+it, run the default sizes on a clean tree and copy results/<commit>.json
+over it.
+
+The CSV tools parse inline (find_duplicates with workers=1, its default) so
+the timing and memory figures cover all of the work in this process.
+
+Usage example:
+    python benchmarks/run_benchmarks.py run                         # small and medium sizes
+    python benchmarks/run_benchmarks.py run --sizes large --only "find_duplicates.*"
+    python benchmarks/run_benchmarks.py compare baseline            # committed baseline vs the current commit
+    python benchmarks/run_benchmarks.py compare HEAD~1              # HEAD~1 results vs the current commit
+    python benchmarks/run_benchmarks.py compare main feature-branch --threshold 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import datetime as dt
+import fnmatch
+import gc
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+import synthetic
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent
+RESULTS_DIR = HERE / "results"
+BASELINE_FILE = HERE / "baseline.json"
+DATA_DIR = HERE / ".data"
+
+sys.path[:0] = [str(ROOT / "playground"), str(ROOT / "scripts")]
+
+SIZES = ("small", "medium", "large")
+DEFAULT_SIZES = ("small", "medium")
+STATS = ("min", "median", "mean")
+
+
+@dataclass
+class Benchmark:
+    name: str
+    unit: str                   # what `items` counts: rows, customers, loans
+    sizes: dict[str, int]       # size label -> items
+    setup: Callable[[int], Callable[[], object]]  # items -> zero-argument function to time
+
+
+def _load_recon():
+    """Import aging-artb.py (the hyphenated name rules out a plain import)."""
+    path = ROOT / "jupyter" / "aging-artb-recon" / "aging-artb.py"
+    spec = importlib.util.spec_from_file_location("aging_artb", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _data_file(kind: str, items: int) -> Path:
+    """Generated input for `kind`, written once per size and DATA_VERSION and reused."""
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    path = DATA_DIR / f"{kind}_{items}_v{synthetic.DATA_VERSION}.csv"
+    if not path.exists():
+        partial = path.with_suffix(".tmp")
+        if kind == "invoices":
+            synthetic.write_invoices_csv(partial, items)
+        elif kind == "invoices_delta":
+            synthetic.write_invoices_delta_csv(partial, items)
+        else:
+            synthetic.write_loan_book(partial, items)
+        partial.replace(path)
+    return path
+
+
+def setup_recon(customers: int) -> Callable[[], object]:
+    recon = _load_recon()
+    aged_raw, tb_raw = synthetic.aging_frames(customers)
+
+    def run() -> object:
+        _, aged_inv = recon.clean_aging(aged_raw)
+        _, tb_inv = recon.clean_tb(tb_raw)
+        return recon.build_recons(aged_inv, tb_inv)
+
+    return run
+
+
+def setup_amortization(loans: int) -> Callable[[], object]:
+    import schedule_cache
+
+    book = schedule_cache.read_loan_book(str(_data_file("loans", loans)), "decimal")
+
+    def run() -> object:
+        return [schedule_cache._run_engine(terms) for _, terms in book]
+
+    return run
+
+
+def setup_schedule_cache(loans: int) -> Callable[[], object]:
+    import schedule_cache
+
+    book = schedule_cache.read_loan_book(str(_data_file("loans", loans)), "decimal")
+
+    def run() -> object:
+        cache = schedule_cache.ScheduleCache()
+        for _, terms in book:
+            cache.schedule(terms)
+        return cache.hit_rate
+
+    return run
+
+
+DISK_BYTES_PER_LOAN = 8 * 1024  # store limit per loan; schedules average ~10 KB, so eviction runs
+
+
+def setup_schedule_cache_disk(loans: int) -> Callable[[], object]:
+    """Cold DiskStore each round: one pass fills it past max_bytes, a reverse pass reads it back.
+
+    The in-process LRU is kept small so the second pass goes to disk; the
+    schedules evicted in the first pass are recomputed and put again.
+    """
+    import schedule_cache
+
+    book = schedule_cache.read_loan_book(str(_data_file("loans", loans)), "decimal")
+    store_dir = Path("schedule_store")
+
+    def run() -> object:
+        shutil.rmtree(store_dir, ignore_errors=True)
+        disk = schedule_cache.DiskStore(store_dir, loans * DISK_BYTES_PER_LOAN)
+        cache = schedule_cache.ScheduleCache(maxsize=64, disk=disk)
+        for _, terms in [*book, *reversed(book)]:
+            cache.schedule(terms)
+        return cache.hit_rate
+
+    return run
+
+
+def _setup_loader(rows: int, **options) -> Callable[[], object]:
+    import csv_to_sqlite
+
+    csv_file = str(_data_file("invoices", rows))
+    db_file = Path("bench.db")
+
+    def run() -> object:
+        db_file.unlink(missing_ok=True)
+        if options.get("sync"):
+            return csv_to_sqlite.sync_csv_to_sqlite(csv_file, str(db_file))
+        return csv_to_sqlite.import_csv_to_sqlite(csv_file, str(db_file), **options)
+
+    return run
+
+
+def setup_sync_delta(rows: int) -> Callable[[], object]:
+    """Sync a small delta (see synthetic.write_invoices_delta_csv) into a table already loaded from the base extract.
+
+    The base load happens once here; each round syncs into a fresh copy of
+    that database, so the timing includes one file copy.
+    """
+    import csv_to_sqlite
+
+    loaded = Path(f"sync_base_{rows}.db")
+    loaded.unlink(missing_ok=True)
+    csv_to_sqlite.sync_csv_to_sqlite(str(_data_file("invoices", rows)), str(loaded))
+    delta_file = str(_data_file("invoices_delta", rows))
+    db_file = Path("bench.db")
+
+    def run() -> object:
+        shutil.copyfile(loaded, db_file)
+        return csv_to_sqlite.sync_csv_to_sqlite(delta_file, str(db_file))
+
+    return run
+
+
+def setup_find_duplicates(rows: int, near: bool = False) -> Callable[[], object]:
+    import find_duplicates
+
+    csv_file = str(_data_file("invoices", rows))
+    if near:
+        return lambda: find_duplicates.find_near_duplicates(csv_file, workers=1)
+    return lambda: find_duplicates.find_duplicates(csv_file, workers=1)
+
+
+INVOICE_SIZES = {"small": 20_000, "medium": 100_000, "large": 500_000}
+LOAN_SIZES = {"small": 200, "medium": 1_000, "large": 5_000}
+
+BENCHMARKS = [
+    Benchmark("recon.aging_vs_tb", "customers", {"small": 500, "medium": 2_000, "large": 8_000}, setup_recon),
+    Benchmark("amortization.decimal_schedules", "loans", LOAN_SIZES, setup_amortization),
+    Benchmark("amortization.schedule_cache", "loans", LOAN_SIZES, setup_schedule_cache),
+    Benchmark("amortization.schedule_cache_disk", "loans", LOAN_SIZES, setup_schedule_cache_disk),
+    Benchmark("csv_to_sqlite.import", "rows", INVOICE_SIZES, _setup_loader),
+    Benchmark("csv_to_sqlite.import_typed", "rows", INVOICE_SIZES,
+              lambda rows: _setup_loader(rows, infer_types=True)),
+    Benchmark("csv_to_sqlite.sync", "rows", INVOICE_SIZES, lambda rows: _setup_loader(rows, sync=True)),
+    Benchmark("csv_to_sqlite.sync_delta", "rows", INVOICE_SIZES, setup_sync_delta),
+    Benchmark("find_duplicates.exact", "rows", INVOICE_SIZES, setup_find_duplicates),
+    Benchmark("find_duplicates.near", "rows", INVOICE_SIZES,
+              lambda rows: setup_find_duplicates(rows, near=True)),
+]
+
+
+def measure(func: Callable[[], object], rounds: int, max_time: float) -> dict:
+    """Peak Python heap (tracemalloc) from one untimed call, then timings for up to `rounds` calls."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    times: list[float] = []
+    budget_start = time.perf_counter()
+    while len(times) < rounds:
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+        if time.perf_counter() - budget_start > max_time:
+            break
+
+    return {
+        "min": min(times),
+        "max": max(times),
+        "mean": statistics.fmean(times),
+        "median": statistics.median(times),
+        "stddev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "rounds": len(times),
+        "py_heap_mb": peak / (1024 * 1024),
+    }
+
+
+def _git(*args: str) -> str:
+    result = subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+def current_commit() -> tuple[str, bool]:
+    """Short hash of HEAD and whether tracked files have uncommitted changes."""
+    dirty = bool(_git("status", "--porcelain", "--untracked-files=no"))
+    return _git("rev-parse", "--short=10", "HEAD"), dirty
+
+
+def results_path(commit: str, dirty: bool = False) -> Path:
+    return RESULTS_DIR / f"{commit}{'-dirty' if dirty else ''}.json"
+
+
+def run_benchmarks(sizes: list[str], only: list[str], rounds: int, max_time: float) -> Path:
+    commit, dirty = current_commit()
+    path = results_path(commit, dirty)
+    existing = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+    results = {(b["name"], b["size"]): b for b in existing.get("benchmarks", [])}
+
+    selected = [b for b in BENCHMARKS if not only or any(fnmatch.fnmatch(b.name, pattern) for pattern in only)]
+    if not selected:
+        raise SystemExit(f"No benchmark matches {only}; available: {', '.join(b.name for b in BENCHMARKS)}")
+
+    print(f"Benchmarking {commit}{' (uncommitted changes)' if dirty else ''}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        cwd = os.getcwd()
+        os.chdir(work_dir)  # the tools write their output files next to the working directory
+        try:
+            for bench in selected:
+                for size in sizes:
+                    items = bench.sizes[size]
+                    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                        func = bench.setup(items)
+                        stats = measure(func, rounds, max_time)
+                    results[(bench.name, size)] = {
+                        "name": bench.name, "size": size, "items": items, "unit": bench.unit, **stats,
+                        "per_sec": items / stats["median"] if stats["median"] else None,
+                    }
+                    print(f"{bench.name:34} {size:6} {items:>8,} {bench.unit:9} "
+                          f"median {stats['median']:8.3f}s  min {stats['min']:8.3f}s  "
+                          f"py heap {stats['py_heap_mb']:8.1f} MB  ({stats['rounds']} rounds)")
+        finally:
+            os.chdir(cwd)
+
+    payload = {
+        "commit": commit,
+        "dirty": dirty,
+        "created": dt.datetime.now().isoformat(timespec="seconds"),
+        "data_version": synthetic.DATA_VERSION,
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "benchmarks": sorted(results.values(), key=lambda b: (b["name"], SIZES.index(b["size"]))),
+    }
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+    print(f"Results written to {path.relative_to(ROOT)}")
+    return path
+
+
+def load_results(ref: Optional[str]) -> dict:
+    """Results for "baseline", a JSON path or a git revision (default: the current commit, dirty run first)."""
+    if ref == "baseline":
+        ref = str(BASELINE_FILE)
+    if ref and ref.endswith(".json"):
+        return json.loads(Path(ref).read_text(encoding="utf-8"))
+    if ref:
+        try:
+            candidates = [results_path(_git("rev-parse", "--short=10", ref))]
+        except subprocess.CalledProcessError:
+            raise SystemExit(f"Unknown revision: {ref}") from None
+    else:
+        commit, dirty = current_commit()
+        candidates = [results_path(commit, True)] if dirty else []
+        candidates.append(results_path(commit))
+    for path in candidates:
+        if path.exists():
+            return json.loads(path.read_text(encoding="utf-8"))
+    raise SystemExit(f"No results for {ref or 'the current commit'} ({candidates[-1].name}); "
+                     f"run `run_benchmarks.py run` on that commit first")
+
+
+def compare(base: dict, head: dict, stat: str, threshold: float, memory_threshold: float) -> int:
+    """Print a comparison table; return the number of regressions."""
+    if base.get("data_version") != head.get("data_version"):
+        print(f"Warning: synthetic data differs (v{base.get('data_version')} vs v{head.get('data_version')})")
+    if base.get("machine") != head.get("machine"):
+        print("Warning: results come from different machines or Python versions")
+
+    base_rows = {(b["name"], b["size"]): b for b in base["benchmarks"]}
+    print(f"{base['commit']} -> {head['commit']}{'-dirty' if head.get('dirty') else ''}  "
+          f"({stat} time, thresholds: time {threshold:g}%, memory {memory_threshold:g}%)")
+    print(f"{'benchmark':34} {'size':6} {'base s':>9} {'head s':>9} {'change':>8} "
+          f"{'base heap':>9} {'head heap':>9} {'change':>8}")
+
+    regressions = 0
+    for row in head["benchmarks"]:
+        old = base_rows.pop((row["name"], row["size"]), None)
+        if old is None:
+            print(f"{row['name']:34} {row['size']:6} {'-':>9} {row[stat]:9.3f}  (new)")
+            continue
+        time_change = (row[stat] / old[stat] - 1) * 100 if old[stat] else 0.0
+        mem_change = (row["py_heap_mb"] / old["py_heap_mb"] - 1) * 100 if old["py_heap_mb"] else 0.0
+        flags = []
+        if time_change > threshold:
+            flags.append("SLOWER")
+        if mem_change > memory_threshold:
+            flags.append("MORE HEAP")
+        regressions += bool(flags)
+        print(f"{row['name']:34} {row['size']:6} {old[stat]:9.3f} {row[stat]:9.3f} {time_change:+7.1f}% "
+              f"{old['py_heap_mb']:9.1f} {row['py_heap_mb']:9.1f} {mem_change:+7.1f}%  {' '.join(flags)}")
+    for name, size in base_rows:
+        print(f"{name:34} {size:6}  (not in head results)")
+
+    print(f"\n{regressions} regression(s)" if regressions else "\nNo regressions")
+    return regressions
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run and compare performance benchmarks for the repo's tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run benchmarks and save results for the current commit")
+    run.add_argument("--sizes", nargs="+", choices=SIZES, default=list(DEFAULT_SIZES),
+                     help="Input sizes to run (default: small medium)")
+    run.add_argument("--only", action="append", default=[], metavar="PATTERN",
+                     help="Run only benchmarks matching this glob, e.g. 'csv_to_sqlite.*' (repeatable)")
+    run.add_argument("--rounds", type=int, default=5, help="Timed rounds per benchmark (default: 5)")
+    run.add_argument("--max-time", type=float, default=30,
+                     help="Stop adding rounds once a benchmark has run this many seconds (default: 30)")
+
+    cmp = sub.add_parser("compare", help="Compare two result sets and flag regressions")
+    cmp.add_argument("base", help="Baseline: 'baseline' (benchmarks/baseline.json), git revision or results JSON file")
+    cmp.add_argument("head", nargs="?", help="Candidate: git revision or results JSON file (default: current commit)")
+    cmp.add_argument("--stat", choices=STATS, default="median", help="Timing statistic to compare (default: median)")
+    cmp.add_argument("--threshold", type=float, default=10,
+                     help="Percent slowdown reported as a regression (default: 10)")
+    cmp.add_argument("--memory-threshold", type=float, default=20,
+                     help="Percent Python-heap growth reported as a regression (default: 20)")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if args.command == "run":
+        run_benchmarks(args.sizes, args.only, args.rounds, args.max_time)
+        return 0
+    regressions = compare(load_results(args.base), load_results(args.head), args.stat,
+                          args.threshold, args.memory_threshold)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
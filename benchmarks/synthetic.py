@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""Deterministic synthetic inputs shaped like the real extracts.
+
+Every generator takes a size and a seed and always produces the same data for
+the same arguments, so benchmark timings from different commits are measured
+on identical inputs. Bump DATA_VERSION whenever a generator changes shape.
+
+- aging_frames():        AR Aging / AR Trial Balance Detail exports, as the
+                         raw DataFrames pandas.read_excel() returns for them
+- write_invoices_csv():  the 40-column invoices extract (short rows, quoted
+                         names, a few exact and near duplicates)
+- write_invoices_delta_csv(): the next extract after write_invoices_csv(),
+                         with a few changed, removed and new invoices
+- write_loan_book():     a loan book CSV for scripts/schedule_cache.py
+
+Usage example:
+    python benchmarks/synthetic.py invoices --size 100000 --out invoices.csv
+    python benchmarks/synthetic.py invoices_delta --size 100000 --out invoices_next.csv
+    python benchmarks/synthetic.py loans --size 5000 --out loans.csv
+    python benchmarks/synthetic.py aging --size 2000 --out-dir ar_reports
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import datetime as dt
+import random
+from pathlib import Path
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+DATA_VERSION = 1
+SEED = 20251231
+
+AS_OF = dt.date(2025, 12, 31)
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+PLACES = ["Kalispell", "Lewiston", "Ferndale", "Missoula", "Helena", "Billings", "Bozeman", "Spokane",
+          "Coeur d'Alene", "Sandpoint", "Whitefish", "Polson", "Moscow", "Pullman", "Butte"]
+SUFFIXES = ["3rd Ave", "5th Ave", "Main St", "Credit Cards", "Propane", "Fuel Depot", "Ranch", "Farms",
+            "Construction", "Excavating", "Auto Repair", "Dental", "School District", "Church"]
+ENTITIES = ["", "", "", ", LLC", ", Inc.", " Co."]
+PRODUCTS = ["Propane", "Diesel", "Heating Oil", "Gasoline", "Service Call", "Tank Rental", "Lubricants",
+            "Propane - Budget", "Diesel #2 Dyed", "Delivery Fee"]
+PAY_TYPES = ["EFT", "CHK", "CC", "ACH"]
+
+# Header of the invoices extract, including the stray columns the export tool adds.
+INVOICE_HEADER = [
+    "CusNo", "CusName", "InvNo", "InvType", "Day", "InvDueDate", "Sts", "pType", "Comment", "Balance",
+    "QryRunTime", "CreateDate", "Updated", "UpdatedTime", "Auto_Notes", "Review", "InvoiceComment_Item",
+    "ManualNotes", "HIGHLITE_3611249", "NOHILITE_27853004", "GT_31464253", "Prev_EFT_Extract_11_4_25_1233",
+    "column_22", "_236_", "CL44118", *[f"column_{i}" for i in range(25, 40)],
+]
+INVOICE_FIELDS = 22  # data rows stop after the last populated column, like the real export
+
+AGING_COLUMNS = [
+    "Customer/_x000a_Invoice Date", "Unnamed: 1", "Invoice _x000a_Number", "Unnamed: 3", "Unnamed: 4",
+    "Unnamed: 5", "Unnamed: 6", "Unnamed: 7", "Unnamed: 8", "Discount_x000a_Amount", "_x000a_Balance",
+    "_x000a_Current", "Unnamed: 12", "Unnamed: 13", "Unnamed: 14", "Days_x000a_Delq", "Unnamed: 16",
+]
+TB_COLUMNS = ["CityServiceValcon, LLC (CSV)", *[f"Unnamed: {i}" for i in range(1, 12)]]
+
+LOAN_TERMS = [60, 84, 120, 180, 240, 360]
+
+
+def _customer_name(rng: random.Random) -> str:
+    return f"{rng.choice(PLACES)} {rng.choice(SUFFIXES)}{rng.choice(ENTITIES)}"
+
+
+def _mdy(day: dt.date) -> str:
+    return f"{day.month}/{day.day}/{day.year}"
+
+
+def _amount(rng: random.Random) -> float:
+    """Invoice amount: mostly small deliveries, a long tail of large ones, some credits."""
+    value = round(rng.lognormvariate(5.5, 1.2), 2)
+    return -value if rng.random() < 0.08 else value
+
+
+def aging_frames(customers: int, seed: int = SEED) -> tuple["pd.DataFrame", "pd.DataFrame"]:
+    """Return (aged_raw, tb_raw) for `customers` customers.
+
+    About 6 invoices per customer. Roughly 1% of invoices are missing from the
+    trial balance and 1% carry a different balance there, so the recon has
+    invoice and customer issues to report.
+    """
+    if pd is None:
+        raise RuntimeError("pandas is required for the AR aging generator")
+    rng = random.Random(seed)
+    aged: list[list] = [[None] * len(AGING_COLUMNS) for _ in range(2)]
+    aged[0][5], aged[0][7], aged[0][12], aged[0][13], aged[0][14] = "Invoice", "Discount", "1 Days", "31 Days", "61 Days"
+    tb: list[list] = [[None] * len(TB_COLUMNS) for _ in range(2)]
+    tb[0][0] = "Customer/_x000a_Invoice_x000a_Number"
+    tb[1][4], tb[1][5], tb[1][6] = "Invoice Amount", "Discount Amount", "Invoice Balance"
+    aged_total = tb_total = 0.0
+
+    cust_no = 0
+    for _ in range(customers):
+        cust_no += rng.randint(1, 12)
+        cust_id = f"{cust_no:07d}"
+        name = _customer_name(rng)
+        aged.append([cust_id, None, name, None, None, None, None, None, "Contact:", "Accounts Payable",
+                     None, "Phone:", None, None, None, "Credit Limit:", 0.0])
+        tb.append([f"{cust_id} {name}"] + [None] * (len(TB_COLUMNS) - 1))
+
+        aged_sum = tb_sum = 0.0
+        for _ in range(max(1, int(rng.expovariate(1 / 6)))):
+            inv_date = AS_OF - dt.timedelta(days=int(rng.expovariate(1 / 20)))
+            due = inv_date + dt.timedelta(days=10)
+            invoice = f"{rng.choice('WS')}{rng.randint(100000, 999999)}-{rng.choice(['IN', 'IN', 'IN', 'PP'])}"
+            balance = _amount(rng)
+            age = (AS_OF - inv_date).days
+            buckets = [0.0, 0.0, 0.0, 0.0, 0.0]
+            buckets[min(age // 30, 4)] = balance
+            aged.append([None, dt.datetime.combine(inv_date, dt.time()), invoice, None, None,
+                         dt.datetime.combine(due, dt.time()), None, "00:00:00", None, 0, balance, *buckets, 0.0])
+            aged_sum += balance
+
+            roll = rng.random()
+            if roll < 0.01:
+                continue  # on the aging only
+            tb_balance = round(balance + rng.choice([-1, 1]) * rng.randint(1, 5000) / 100, 2) if roll < 0.02 else balance
+            tb.append([invoice, dt.datetime.combine(inv_date, dt.time()), dt.datetime.combine(due, dt.time()),
+                       "00:00:00", tb_balance, 0, tb_balance, "INV", pd.Timestamp(inv_date), tb_balance, None, None])
+            if rng.random() < 0.1:
+                tb.append([None] * 7 + ["PAY", pd.Timestamp(inv_date), -round(rng.random() * 10, 2),
+                                        f"C{rng.randint(1000000, 9999999)}", dt.datetime.combine(inv_date, dt.time())])
+            tb_sum += tb_balance
+
+        aged.append([None] * len(AGING_COLUMNS))
+        aged.append([f"Customer {cust_id} Totals:", None, None, None, None, None, None, None, None, 0,
+                     round(aged_sum, 2), round(aged_sum, 2), 0, 0, 0, 0, None])
+        tb.append([f"Customer {cust_id} Totals:", None, None, None, round(tb_sum, 2), 0, round(tb_sum, 2),
+                   None, None, round(tb_sum, 2), None, None])
+        aged_total += aged_sum
+        tb_total += tb_sum
+
+    aged.append(["Report Totals:", None, None, None, None, None, None, None, None, 0,
+                 round(aged_total, 2), round(aged_total, 2), 0, 0, 0, 0, None])
+    aged.append(["Number of Customers:", None, None, None, None, None, None, None, customers] + [None] * 8)
+    aged.append(["Run Date:", dt.datetime(2026, 1, 12, 10, 39, 42)] + [None] * 13 + ["Page:", 1.0])
+    aged.append(["A/R Date:", dt.datetime.combine(AS_OF, dt.time())] + [None] * 5
+                + ["User Logon:", "benchmark"] + [None] * 8)
+    tb.append(["Report Totals:", None, None, None, round(tb_total, 2), 0, round(tb_total, 2),
+               None, None, round(tb_total, 2), None, None])
+    tb.append([f"Number of Customers: {customers:,}"] + [None] * 11)
+    tb.append(["Run Date: 1/12/2026   9:48:51AM", None, None, "Page: 1"] + [None] * 8)
+    tb.append([f"A/R Date: {_mdy(AS_OF)}", None, None, "User Logon:  benchmark"] + [None] * 8)
+
+    return pd.DataFrame(aged, columns=AGING_COLUMNS), pd.DataFrame(tb, columns=TB_COLUMNS)
+
+
+def invoice_rows(rows: int, seed: int = SEED):
+    """Yield `rows` data rows of the invoices extract.
+
+    About 2% of rows repeat an earlier row under a new invoice number (exact
+    duplicates for find_duplicates) and 1% repeat one with the due date moved
+    a day or the comment re-cased (near duplicates).
+    """
+    rng = random.Random(seed)
+    recent: list[list[str]] = []
+    next_invoice = 300000
+    cust_no = 0
+    emitted = 0
+    while emitted < rows:
+        cust_no += rng.randint(1, 12)
+        cust_id = f"{cust_no:07d}"
+        name = _customer_name(rng)
+        pay_type = rng.choice(PAY_TYPES)
+        for _ in range(max(1, int(rng.expovariate(1 / 8)))):
+            if emitted >= rows:
+                break
+            next_invoice += 1
+            roll = rng.random()
+            if recent and roll < 0.03:
+                row = list(rng.choice(recent))
+                row[2] = f"S{next_invoice}"
+                if roll >= 0.02:
+                    if rng.random() < 0.5:
+                        due = dt.datetime.strptime(row[5], "%m/%d/%Y").date() + dt.timedelta(days=1)
+                        row[5] = _mdy(due)
+                    else:
+                        row[8] = row[8].upper()
+            else:
+                created = AS_OF - dt.timedelta(days=int(rng.expovariate(1 / 30)))
+                due = created + dt.timedelta(days=14)
+                run = created + dt.timedelta(days=13)
+                product = rng.choice(PRODUCTS)
+                balance = _amount(rng)
+                row = [
+                    cust_id, name, f"S{next_invoice}", "CM" if balance < 0 else "IN", WEEKDAYS[due.weekday()],
+                    _mdy(due), "S", pay_type, product, f"{balance:g}",
+                    f"{_mdy(run)} {rng.randint(6, 17)}:{rng.randint(0, 59):02d}", _mdy(created), _mdy(created),
+                    f"{rng.random() * 24:.5f}", f"{rng.randint(1, 120):03d}", rng.choice(["FALSE", "FALSE", "TRUE"]),
+                    product, "Call before delivery" if rng.random() < 0.05 else "", "", "", "", "",
+                ]
+                recent.append(row)
+                if len(recent) > 500:
+                    recent.pop(rng.randrange(len(recent)))
+            yield row
+            emitted += 1
+
+
+def write_invoices_csv(path: Path, rows: int, seed: int = SEED) -> Path:
+    """Write the invoices extract with `rows` data rows to `path`."""
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(INVOICE_HEADER)
+        writer.writerows(invoice_rows(rows, seed))
+    return path
+
+
+def write_invoices_delta_csv(path: Path, rows: int, seed: int = SEED) -> Path:
+    """Write the extract that follows write_invoices_csv(path, rows): a small delta on the same rows.
+
+    About 1% of the rows have their balance halved (a partial payment), 0.5%
+    are gone (paid off) and rows // 200 new invoices follow the last one.
+    """
+    rng = random.Random(seed + 1)
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(INVOICE_HEADER)
+        # invoice_rows is prefix-stable, so the first `rows` rows are the original extract
+        for n, row in enumerate(invoice_rows(rows + rows // 200, seed)):
+            if n < rows:
+                roll = rng.random()
+                if roll < 0.005:
+                    continue
+                if roll < 0.015:
+                    row = list(row)  # rows are shared with later duplicates
+                    row[9] = f"{float(row[9]) / 2:g}"
+            writer.writerow(row)
+    return path
+
+
+def write_loan_book(path: Path, loans: int, seed: int = SEED) -> Path:
+    """Write a loan book with `loans` loans to `path`.
+
+    Principals, rates and terms come from a small product grid, so a large
+    book repeats terms the way a real portfolio does (which is what the
+    schedule cache relies on). About 10% of loans pay extra principal.
+    """
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["loan_id", "principal", "apr", "term_months", "extra_principal", "start_date"])
+        for n in range(1, loans + 1):
+            term = rng.choice(LOAN_TERMS)
+            principal = rng.randint(2, 100) * 5000
+            apr = 3 + rng.randint(0, 48) * 0.125
+            extra = rng.choice([50, 100, 250]) if rng.random() < 0.1 else 0
+            start = dt.date(2025, rng.randint(1, 12), 1)
+            writer.writerow([f"L{n:06d}", f"{principal:,.2f}", f"{apr:.3f}", term, extra, start.isoformat()])
+    return path
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Write deterministic synthetic inputs for the tools.")
+    parser.add_argument("kind", choices=["invoices", "invoices_delta", "loans", "aging"], help="Which input to generate")
+    parser.add_argument("--size", type=int, required=True, help="Rows (invoices, invoices_delta), loans (loans) or customers (aging)")
+    parser.add_argument("--seed", type=int, default=SEED, help=f"Random seed (default: {SEED})")
+    parser.add_argument("--out", type=str, help="Output CSV for invoices/invoices_delta/loans")
+    parser.add_argument("--out-dir", type=str, default=".", help="Output folder for the aging workbooks (default: .)")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.kind == "aging":
+        out_dir = Path(args.out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        aged_raw, tb_raw = aging_frames(args.size, args.seed)
+        aged_raw.to_excel(out_dir / "AR_AgedInvoiceReport.xlsx", index=False)
+        tb_raw.to_excel(out_dir / "AR_TrialBalanceDetail.xlsx", index=False)
+        print(f"Wrote {len(aged_raw)} aging rows and {len(tb_raw)} TB rows to {out_dir}")
+        return
+    out = Path(args.out or f"{args.kind}_{args.size}.csv")
+    if args.kind == "invoices":
+        write_invoices_csv(out, args.size, args.seed)
+    elif args.kind == "invoices_delta":
+        write_invoices_delta_csv(out, args.size, args.seed)
+    else:
+        write_loan_book(out, args.size, args.seed)
+    print(f"Wrote {args.size} {args.kind} rows to {out}")
+
+
+if __name__ == "__main__":
+    main()
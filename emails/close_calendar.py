@@ -0,0 +1,479 @@
+"""Shared month-end close calendar core.
+
+Business days come from a precomputed, holiday-aware index (bisect over sorted
+ordinals instead of walking day by day). The email templates are parsed once;
+entity settings are bound once per entity, so each month only fills in dates.
+Output formats: plain email text, Markdown, and ICS (one calendar per entity).
+
+Usage:
+    python close_calendar.py 2026                                  # default entity, 12 months, all formats
+    python close_calendar.py 2026 --entities entities.json --format md ics --out-dir calendars
+    python close_calendar.py 2026 --months 1 2 3 --no-us-holidays
+
+entities.json is a list of objects with "name" and any of timezone_label, erp,
+statements, warehouses, signature, us_holidays, holidays (list of YYYY-MM-DD).
+"""
+
+from __future__ import annotations
+
+import argparse
+import calendar
+import json
+import re
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from string import Formatter
+from typing import Iterable, Iterator
+
+BUSINESS_DAYS = 7  # close runs through Business Day 7 of the following month
+
+# =============== HOLIDAYS ===============
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-th weekday (0=Monday) of a month; n=-1 for the last one."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year, month, calendar.monthrange(year, month)[1])
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(d: date) -> date:
+    """Saturday holidays are observed Friday, Sunday holidays Monday."""
+    if d.weekday() == 5:
+        return d - timedelta(days=1)
+    if d.weekday() == 6:
+        return d + timedelta(days=1)
+    return d
+
+
+def us_holidays(year: int) -> set[date]:
+    """Observed dates of the usual office holidays in a calendar year."""
+    return {
+        _observed(date(year, 1, 1)),            # New Year's Day
+        _nth_weekday(year, 5, 0, -1),           # Memorial Day
+        _observed(date(year, 7, 4)),            # Independence Day
+        _nth_weekday(year, 9, 0, 1),            # Labor Day
+        _nth_weekday(year, 11, 3, 4),           # Thanksgiving
+        _observed(date(year, 12, 25)),          # Christmas Day
+    }
+
+
+# =============== BUSINESS-DAY INDEX ===============
+class BusinessCalendar:
+    """Sorted business-day ordinals for a span of years, extended on demand."""
+
+    def __init__(self, holidays: Iterable[date] = (), us: bool = True) -> None:
+        self.extra_holidays = frozenset(holidays)
+        self.us = us
+        self.first_year = self.last_year = None
+        self._ordinals: list[int] = []
+
+    def _build(self, first_year: int, last_year: int) -> None:
+        closed = set(self.extra_holidays)
+        if self.us:
+            for year in range(first_year - 1, last_year + 2):  # observed dates can cross a year end
+                closed |= us_holidays(year)
+        start = date(first_year, 1, 1).toordinal()
+        end = date(last_year, 12, 31).toordinal()
+        self._ordinals = [o for o in range(start, end + 1)
+                          if (o - 1) % 7 < 5 and date.fromordinal(o) not in closed]  # ordinal 1 is a Monday
+        self.first_year, self.last_year = first_year, last_year
+
+    def _cover(self, year: int) -> None:
+        if self.first_year is None:
+            self._build(year, year + 1)
+        elif year < self.first_year or year > self.last_year:
+            self._build(min(year, self.first_year), max(year, self.last_year))
+
+    def is_business_day(self, d: date) -> bool:
+        self._cover(d.year)
+        o = d.toordinal()
+        i = bisect_left(self._ordinals, o)
+        return i < len(self._ordinals) and self._ordinals[i] == o
+
+    def last_business_day(self, year: int, month: int) -> date:
+        self._cover(year)
+        last = date(year, month, calendar.monthrange(year, month)[1]).toordinal()
+        return date.fromordinal(self._ordinals[bisect_right(self._ordinals, last) - 1])
+
+    def first_business_days(self, year: int, month: int, n: int = BUSINESS_DAYS) -> list[date]:
+        self._cover(year + 1 if month == 12 else year)  # n business days can spill into the next month
+        i = bisect_left(self._ordinals, date(year, month, 1).toordinal())
+        return [date.fromordinal(o) for o in self._ordinals[i:i + n]]
+
+
+# =============== TEMPLATES ===============
+class CompiledTemplate:
+    """A str.format-style template parsed once into literal/field segments."""
+
+    def __init__(self, text: str = "", segments: list[tuple[bool, str]] | None = None) -> None:
+        if segments is None:
+            segments = []
+            for literal, name, spec, conversion in Formatter().parse(text):
+                if spec or conversion:
+                    raise ValueError(f"Template fields take no format spec or conversion: {name!r}")
+                if literal:
+                    segments.append((False, literal))
+                if name is not None:
+                    segments.append((True, name))
+        self.segments = segments
+        self.fields = {value for is_field, value in segments if is_field}
+
+    def bind(self, values: dict[str, str]) -> "CompiledTemplate":
+        """Fill in the fields present in values; the rest stay open for render()."""
+        segments: list[tuple[bool, str]] = []
+        for is_field, value in self.segments:
+            if is_field and value in values:
+                is_field, value = False, values[value]
+            if not is_field and segments and not segments[-1][0]:
+                segments[-1] = (False, segments[-1][1] + value)
+            else:
+                segments.append((is_field, value))
+        return CompiledTemplate(segments=segments)
+
+    def render(self, values: dict[str, str]) -> str:
+        return "".join(values[value] if is_field else value for is_field, value in self.segments)
+
+
+PLAIN_TEMPLATE = CompiledTemplate("""Month-end close schedule for {month_name} {year}
+
+
+Good morning,
+
+
+Below is the month-end close schedule for {month_name} {year}. Please review the schedule below and plan accordingly for resources and timing.
+
+If anyone will be out during any of the dates listed below, it is critical that you make sure there is a plan in place for coverage of any month-end responsibilities, to ensure all tasks are completed during your absence.
+
+{d0_long}
+
+Freeze inventory for {warehouses} warehouses – 12Noon {tz} – All users exit {erp} for 15 mins.
+
+Physical Inventory Counts – {warehouses_cap} inventory counted and entered in {erp}.
+
+All bank deposits made in the bank and all cash receipts posted in {erp} before end of day.
+
+
+{bd1_long} (Business Day 1)
+
+Very first thing ({bd1_day_name} morning, {bd1_month_day}) – All remaining physical inventory counts completed.
+
+Any inventory counts for {d0_month_day} completed on the morning of {bd1_month_day}, MUST be adjusted for any changes in inventory that may have occurred after {d0_month_day}. Physical counts must accurately reflect actual on-hand inventory quantities at the close of business on {d0_long}.
+
+Review inventory counts and resolve any variances – First thing in the morning.
+
+Process customer finance charges – 4pm {tz}.
+
+
+{bd2_long} (Business Day 2)
+
+All sales orders with a {month_name} ship date must be posted, deleted, or changed to a {month_name} ship date (as applicable) by 3pm {tz}.
+
+All invoice data entry batches posted – before 4pm {tz}.
+
+Freeze remaining inventory – 4pm {tz} – All users exit {erp} for 15 mins.
+
+Process monthly customer statements.
+
+All remaining cash receipts batches posted before 6pm {tz}.
+
+Perform month-end close procedures 6pm {tz} – everyone must exit {erp} until notification that {erp} is available again.
+
+
+{bd3_long} (Business Day 3)
+
+Mail customer statements.
+
+
+{bd4_long} (Business Day 4)
+
+A/P closed for {month_name}. All remaining {month_name} invoices must be approved AND submitted to A/P prior to 6pm {tz}.
+
+
+{bd5_long} (Business Day 5)
+
+Review month-end financial balances.
+
+Preliminary BULOC Trend Report.
+
+
+{bd6_long} (Business Day 6)
+
+Upload trial balances to {statements}.
+
+
+{bd7_long} (Business Day 7)
+
+Issue financial statements.
+
+
+Thank you,""")
+
+MARKDOWN_TEMPLATE = CompiledTemplate("""# __**Month-end close schedule for {month_name} {year}**__
+
+Good morning,
+
+Below is the month-end close schedule for {month_name} {year}. Please review the schedule below and plan accordingly.
+
+## **{d0_long}**
+
+- __Freeze inventory__ for {warehouses} – 12Noon {tz} – all users exit **{erp}** for 15 mins.
+- Physical Inventory Counts – {warehouses_cap} entered in **{erp}**.
+- All deposits/cash receipts posted in **{erp}** before end of day.
+
+## **{bd1_long} (Business Day 1)**
+
+- All remaining inventory counts completed first thing ({bd1_month_day}).
+- Adjust any counts from {d0_month_day} to reflect end-of-day balances.
+- Review variances in the morning.
+- Process customer finance charges – 4pm {tz}.
+
+## **{bd2_long} (Business Day 2)**
+
+- All sales orders with a {month_name} ship date posted/changed by 3pm {tz}.
+- All invoice batches posted by 4pm {tz}.
+- __Freeze remaining inventory__ – 4pm {tz} (all users exit **{erp}**).
+- Process monthly customer statements.
+- All remaining cash receipts posted before 6pm {tz}.
+- Perform month-end close procedures – 6pm {tz} until release.
+
+## **{bd3_long} (Business Day 3)**
+- Mail customer statements.
+
+## **{bd4_long} (Business Day 4)**
+- A/P closed for {month_name} – all invoices approved by 6pm {tz}.
+
+## **{bd5_long} (Business Day 5)**
+- Review month-end financial balances.
+- Preliminary BULOC Trend Report.
+
+## **{bd6_long} (Business Day 6)**
+- Upload trial balances to **{statements}**.
+
+## **{bd7_long} (Business Day 7)**
+- Issue financial statements.
+
+Thank you,
+
+{signature}
+""")
+
+# Calendar events: (day key, summary, description); d0 is the last business day of the month.
+ICS_EVENTS = [
+    (key, CompiledTemplate(summary), CompiledTemplate(description))
+    for key, summary, description in [
+        ("d0", "{month_name} close: inventory freeze and counts",
+         "Freeze inventory for {warehouses} – 12Noon {tz} – all users exit {erp} for 15 mins.\n"
+         "Physical inventory counts entered in {erp}.\n"
+         "All deposits/cash receipts posted in {erp} before end of day."),
+        ("bd1", "{month_name} close BD1: counts complete, finance charges",
+         "All remaining inventory counts completed first thing.\n"
+         "Adjust any counts from {d0_month_day} to reflect end-of-day balances.\n"
+         "Process customer finance charges – 4pm {tz}."),
+        ("bd2", "{month_name} close BD2: post batches, statements, close {erp}",
+         "Sales orders with a {month_name} ship date posted/changed by 3pm {tz}.\n"
+         "Invoice batches posted by 4pm {tz}; freeze remaining inventory – 4pm {tz}.\n"
+         "Process monthly customer statements; cash receipts posted before 6pm {tz}.\n"
+         "Month-end close procedures – 6pm {tz}, everyone out of {erp} until release."),
+        ("bd3", "{month_name} close BD3: mail statements", "Mail customer statements."),
+        ("bd4", "{month_name} close BD4: A/P closed",
+         "A/P closed for {month_name} – all invoices approved and submitted by 6pm {tz}."),
+        ("bd5", "{month_name} close BD5: review balances",
+         "Review month-end financial balances.\nPreliminary BULOC Trend Report."),
+        ("bd6", "{month_name} close BD6: upload trial balances",
+         "Upload trial balances to {statements}."),
+        ("bd7", "{month_name} close BD7: issue financial statements", "Issue financial statements."),
+    ]
+]
+
+FORMATS = ("plain", "md", "ics")
+
+
+# =============== ENTITIES ===============
+@dataclass(frozen=True)
+class Entity:
+    name: str = "CityServiceValcon, LLC"
+    timezone_label: str = "MDT"
+    erp: str = "DM2"
+    statements: str = "NorthStar"
+    warehouses: str = "lube, agronomy, and feeds"
+    signature: str = "Travis Pickens\n\nAccounting Manager | CityServiceValcon, LLC"
+    us_holidays: bool = True
+    holidays: frozenset[date] = field(default_factory=frozenset)
+
+    @property
+    def slug(self) -> str:
+        return re.sub(r"[^0-9a-z]+", "-", self.name.lower()).strip("-") or "entity"
+
+    def values(self) -> dict[str, str]:
+        return {
+            "tz": self.timezone_label,
+            "erp": self.erp,
+            "statements": self.statements,
+            "warehouses": self.warehouses,
+            "warehouses_cap": self.warehouses.capitalize(),
+            "signature": self.signature,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Entity":
+        data = dict(data)
+        data["holidays"] = frozenset(date.fromisoformat(d) for d in data.get("holidays", ()))
+        return cls(**data)
+
+
+def _fmt_long(d: date) -> str:
+    return f"{calendar.day_name[d.weekday()]}, {calendar.month_name[d.month]} {d.day}"
+
+
+def _fmt_month_day(d: date) -> str:
+    return f"{calendar.month_name[d.month]} {d.day}"
+
+
+class CloseCalendar:
+    """Renders close schedules; calendars are shared by entities with the same holidays."""
+
+    def __init__(self) -> None:
+        self._calendars: dict[tuple, BusinessCalendar] = {}
+        self._bound: dict[tuple, CompiledTemplate] = {}
+
+    def business_calendar(self, entity: Entity) -> BusinessCalendar:
+        key = (entity.us_holidays, entity.holidays)
+        if key not in self._calendars:
+            self._calendars[key] = BusinessCalendar(entity.holidays, us=entity.us_holidays)
+        return self._calendars[key]
+
+    def close_days(self, entity: Entity, year: int, month: int) -> dict[str, date]:
+        """{"d0": last business day of the month, "bd1".."bd7": first business days of the next}."""
+        cal = self.business_calendar(entity)
+        next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+        days = {"d0": cal.last_business_day(year, month)}
+        for n, d in enumerate(cal.first_business_days(next_year, next_month), start=1):
+            days[f"bd{n}"] = d
+        return days
+
+    def month_values(self, entity: Entity, year: int, month: int) -> tuple[dict[str, str], dict[str, date]]:
+        days = self.close_days(entity, year, month)
+        values = {"month_name": calendar.month_name[month], "year": str(year)}
+        for key, d in days.items():
+            values[f"{key}_long"] = _fmt_long(d)
+            values[f"{key}_month_day"] = _fmt_month_day(d)
+            values[f"{key}_day_name"] = calendar.day_name[d.weekday()]
+        return values, days
+
+    def _template(self, entity: Entity, name: str, template: CompiledTemplate) -> CompiledTemplate:
+        key = (entity, name)
+        if key not in self._bound:
+            self._bound[key] = template.bind(entity.values())
+        return self._bound[key]
+
+    def plain(self, entity: Entity, year: int, month: int) -> str:
+        return self._template(entity, "plain", PLAIN_TEMPLATE).render(self.month_values(entity, year, month)[0])
+
+    def markdown(self, entity: Entity, year: int, month: int) -> str:
+        return self._template(entity, "md", MARKDOWN_TEMPLATE).render(self.month_values(entity, year, month)[0])
+
+    def ics(self, entity: Entity, months: Iterable[tuple[int, int]]) -> str:
+        """One VCALENDAR with an all-day event per close milestone for each (year, month)."""
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//month-end close calendar//EN",
+                 "CALSCALE:GREGORIAN", f"X-WR-CALNAME:{_ics_text(entity.name)} month-end close"]
+        events = [(key, self._template(entity, f"ics-s-{key}", summary), self._template(entity, f"ics-d-{key}", desc))
+                  for key, summary, desc in ICS_EVENTS]
+        for year, month in months:
+            values, days = self.month_values(entity, year, month)
+            for key, summary, description in events:
+                d = days[key]
+                lines += [
+                    "BEGIN:VEVENT",
+                    f"UID:{entity.slug}-{year}{month:02d}-{key}@month-end-close",
+                    f"DTSTAMP:{stamp}",
+                    f"DTSTART;VALUE=DATE:{d:%Y%m%d}",
+                    f"DTEND;VALUE=DATE:{d + timedelta(days=1):%Y%m%d}",
+                    f"SUMMARY:{_ics_text(summary.render(values))}",
+                    f"DESCRIPTION:{_ics_text(description.render(values))}",
+                    "TRANSP:TRANSPARENT",
+                    "END:VEVENT",
+                ]
+        lines.append("END:VCALENDAR")
+        return "".join(_fold(line) + "\r\n" for line in lines)
+
+
+def _ics_text(text: str) -> str:
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _fold(line: str) -> str:
+    """Fold content lines at 75 octets (RFC 5545), without splitting a UTF-8 character."""
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line
+    parts, start, limit = [], 0, 75
+    while start < len(data):
+        end = min(start + limit, len(data))
+        while end < len(data) and (data[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(data[start:end].decode("utf-8"))
+        start, limit = end, 74  # continuation lines start with a space
+    return "\r\n ".join(parts)
+
+
+def render_batch(
+    entities: Iterable[Entity], year: int, months: Iterable[int] = range(1, 13), formats: Iterable[str] = FORMATS
+) -> Iterator[tuple[Entity, int | None, str, str]]:
+    """Yield (entity, month, format, text) for every entity × month; ICS yields once per entity (month None)."""
+    close = CloseCalendar()
+    months = list(months)
+    formats = list(formats)
+    for entity in entities:
+        for month in months:
+            if "plain" in formats:
+                yield entity, month, "plain", close.plain(entity, year, month)
+            if "md" in formats:
+                yield entity, month, "md", close.markdown(entity, year, month)
+        if "ics" in formats:
+            yield entity, None, "ics", close.ics(entity, [(year, m) for m in months])
+
+
+# =============== CLI ===============
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Generate month-end close schedules for many entities and months.")
+    p.add_argument("year", type=int, help="Close year (the month being closed)")
+    p.add_argument("--months", type=int, nargs="+", default=list(range(1, 13)), help="Months to close (default: all)")
+    p.add_argument("--entities", help="JSON file with a list of entity settings (default: the single built-in entity)")
+    p.add_argument("--format", nargs="+", choices=FORMATS, default=list(FORMATS), help="Output formats (default: all)")
+    p.add_argument("--out-dir", default="close_calendars", help="Output directory (default: close_calendars)")
+    p.add_argument("--no-us-holidays", action="store_true", help="Only skip weekends and listed holidays")
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    start = time.perf_counter()
+    if args.entities:
+        entities = [Entity.from_dict(e) for e in json.loads(Path(args.entities).read_text(encoding="utf-8"))]
+    else:
+        entities = [Entity()]
+    if args.no_us_holidays:
+        entities = [replace(e, us_holidays=False) for e in entities]
+
+    out_dir = Path(args.out_dir)
+    suffixes = {"plain": "txt", "md": "md", "ics": "ics"}
+    count = 0
+    for entity, month, fmt, text in render_batch(entities, args.year, args.months, args.format):
+        folder = out_dir / entity.slug
+        folder.mkdir(parents=True, exist_ok=True)
+        name = f"{args.year}_close.ics" if month is None else f"{args.year}-{month:02d}_close.{suffixes[fmt]}"
+        # write_bytes keeps the CRLF line endings ICS requires (write_text would translate on Windows)
+        (folder / name).write_bytes(text.encode("utf-8"))
+        count += 1
+    print(f"Wrote {count} files for {len(entities)} entities x {len(args.months)} months to {out_dir} "
+          f"in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
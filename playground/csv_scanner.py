@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+CSV scanner shared by the playground tools.
+
+The encoding (BOM, UTF-8, else cp1252) and the dialect (delimiter and quote
+character) are sniffed from a sample, and rows are handed out in file order,
+padded or truncated to the header width. Plain reads (rows, batches,
+columnar, and map with one worker) stream the file through one csv.reader.
+
+map(func, workers=N) with N > 1 runs a reduction over newline-aligned byte
+ranges of the memory-mapped file on a process pool and returns only its
+results (digests, counts), never the rows. A range only ends on a newline
+that sits outside a quoted field: quote characters are counted from the
+previous boundary, so an even count means the newline ends a record. That
+breaks on a bare quote inside an unquoted field (Pipe 12"), so the file is
+checked for those first, and only when it is about to be split; such a
+file, or a UTF-16 one, is read sequentially instead.
+
+Row numbers follow the tools' convention (and csv.DictReader's): the header
+is row 1, the first data record is row 2, and blank lines are skipped
+without being counted.
+
+Usage:
+    python csv_scanner.py input.csv              # sniffed settings, rows/sec
+    python csv_scanner.py input.csv --workers 4  # count rows on 4 processes
+"""
+
+import argparse
+import codecs
+import csv
+import io
+import mmap
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, count, islice
+from operator import itemgetter, methodcaller
+
+CHUNK_BYTES = 8 * 1024 * 1024   # target size of one parse unit
+SAMPLE_BYTES = 64 * 1024        # bytes read to sniff the encoding and dialect
+DELIMITERS = ',;\t|'
+STREAM_ROWS = 50000             # batch size when a file has to be read sequentially
+
+BOMS = [
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+]
+
+
+class Batch:
+    """A run of parsed rows; first_row is the row number of rows[0]."""
+
+    __slots__ = ('first_row', 'rows')
+
+    def __init__(self, first_row, rows):
+        self.first_row = first_row
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def columns(self):
+        """The batch as one tuple per column."""
+        return list(zip(*self.rows))
+
+
+def sniff_encoding(sample):
+    """Return (encoding, bom_length) for the start of a file."""
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding, len(bom)
+    cut = sample.rfind(b'\n')
+    try:
+        sample[:cut if cut > 0 else len(sample)].decode('utf-8')
+        return 'utf-8', 0
+    except UnicodeDecodeError:
+        return 'cp1252', 0
+
+
+def sniff_dialect(text):
+    """Reader keyword arguments (delimiter, quotechar) sniffed from a text sample; excel defaults otherwise."""
+    try:
+        dialect = csv.Sniffer().sniff(text, delimiters=DELIMITERS)
+    except csv.Error:
+        return {'delimiter': ',', 'quotechar': '"'}
+    return {'delimiter': dialect.delimiter, 'quotechar': dialect.quotechar or '"'}
+
+
+def _padded_tuples(reader, width):
+    """Rows as tuples of exactly width fields; blank lines are skipped, as csv.DictReader does."""
+    padding = [''] * width
+    return [tuple(row) if len(row) == width
+            else tuple(row + padding[len(row):]) if len(row) < width
+            else tuple(row[:width])
+            for row in reader if row]
+
+
+def _padded(reader, width):
+    """Rows of exactly width fields, one at a time; rows that already fit are the reader's own lists."""
+    padding = [''] * width
+    for row in filter(None, reader):
+        n = len(row)
+        yield row if n == width else row + padding[n:] if n < width else row[:width]
+
+
+def _reduce(rows, func, args):
+    """
+    Run func(rows, *args) over an iterator of padded rows and return (row count, result).
+
+    The rows are streamed rather than collected first, which roughly halves
+    the cost of a pass; func must consume them all. They are counted by
+    zipping them with a counter, which keeps the count out of Python code.
+    """
+    counter = count()
+    result = func(map(itemgetter(0), zip(rows, counter)), *args)
+    return next(counter), result
+
+
+def _reader(data, encoding, dialect):
+    return csv.reader(io.TextIOWrapper(io.BytesIO(data), encoding=encoding, newline=''), **dialect)
+
+
+def _scan_range(path, start, end, encoding, dialect, width, func, args):
+    """Worker entry point: decode bytes [start, end) of path and reduce them with func."""
+    with open(path, 'rb') as f:
+        if end - start >= mmap.ALLOCATIONGRANULARITY:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                data = mm[start:end]
+        else:
+            f.seek(start)
+            data = f.read(end - start)
+    return _reduce(_padded(_reader(data, encoding, dialect), width), func, args)
+
+
+def _drain(rows):
+    for _ in rows:
+        pass
+
+
+class CSVScanner:
+    """
+    Chunked reader for one CSV file.
+
+    Args:
+        path: CSV file
+        encoding: Text encoding (default: sniffed)
+        delimiter: Field delimiter (default: sniffed from the first SAMPLE_BYTES)
+        chunk_bytes: Target size of each range when map() splits the file for workers
+    """
+
+    def __init__(self, path, encoding=None, delimiter=None, chunk_bytes=CHUNK_BYTES):
+        self.path = os.fspath(path)
+        self.chunk_bytes = chunk_bytes
+        self._file = open(self.path, 'rb')
+        self.size = os.fstat(self._file.fileno()).st_size
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+
+        sniffed, bom = sniff_encoding(self._mm[:SAMPLE_BYTES])
+        self.encoding = encoding or sniffed
+        # Byte-range splitting needs newline and quote bytes that cannot occur inside
+        # another character: true for UTF-8 and single-byte code pages, not UTF-16.
+        self._byte_safe = codecs.lookup(self.encoding).name not in ('utf-16', 'utf-16-le', 'utf-16-be')
+
+        sample = self._mm[bom:bom + SAMPLE_BYTES].decode(self.encoding, errors='ignore')
+        self.dialect = sniff_dialect(sample)
+        if delimiter:
+            self.dialect['delimiter'] = delimiter
+
+        if self._byte_safe:
+            self.data_start = self._boundary(bom, bom)
+            header_text = self._mm[bom:self.data_start].decode(self.encoding)
+            header = next(csv.reader(io.StringIO(header_text, newline=''), **self.dialect), [])
+        else:
+            self.data_start = bom
+            with open(self.path, 'r', encoding=self.encoding, newline='') as f:
+                header = next(csv.reader(f, **self.dialect), [])
+            if header:
+                header[0] = header[0].lstrip('\ufeff')
+        self.headers = header
+        self.width = len(header)
+        self._splittable = None
+        self._ranges = None
+        self.chunk_rows = None  # rows per range, known after a pass split across workers
+        self._header_lines = None  # set, with _one_line, by a full sequential pass
+        self._one_line = False
+
+    def close(self):
+        if self.size:
+            self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def splittable(self):
+        """True if the file can be split into byte ranges; checked (one pass over the bytes) on first use."""
+        if self._splittable is None:
+            # A quote inside an unquoted field (12" pipe) breaks quote counting;
+            # such files are read sequentially instead, which is always safe.
+            self._splittable = self._byte_safe and not self._has_bare_quotes()
+        return self._splittable
+
+    def _has_bare_quotes(self):
+        """
+        True if any quote character is not part of a well-formed quoted field.
+
+        A quoted field opens right after a delimiter or newline and closes right
+        before one (or at the end of the file); inside it quotes only come as
+        doubled pairs. All such fields are cut out of each range, and any quote
+        left over (12" at the end of a field, 12"x, a stray pair) is bare. A
+        range boundary misplaced by a bare quote leaves an unclosed field
+        behind, so that is caught too.
+        """
+        quote = re.escape(self.dialect['quotechar'].encode(self.encoding))
+        delimiter = re.escape(self.dialect['delimiter'].encode(self.encoding))
+        # Starts with the literal quote so the regex engine can skip ahead; the
+        # lookbehind then checks the byte before it.
+        inner = b'[^' + quote + b']*'
+        field = re.compile(quote + b'(?<=[' + delimiter + b'\n]' + quote + b')' + inner + b'(?:' + quote * 2 + inner
+                           + b')*' + quote + b'(?=[' + delimiter + b'\r\n]|\\Z)')
+        raw_quote = self.dialect['quotechar'].encode(self.encoding)
+        for start, end in self._split():
+            # Ranges start right after a newline; put it back so the lookbehind sees it
+            if self._mm.find(raw_quote, start, end) >= 0 and raw_quote in field.sub(b'', b'\n' + self._mm[start:end]):
+                return True
+        return False
+
+    def _boundary(self, start, target):
+        """
+        Offset just past the first newline at or after target that ends a record.
+
+        start must be a record boundary; quotes are counted from there, so a
+        newline preceded by an even number of quote characters is outside a field.
+        """
+        if target >= self.size:
+            return self.size
+        quote = self.dialect['quotechar'].encode(self.encoding)
+        odd = self._mm[start:target].count(quote) & 1
+        pos = target
+        while True:
+            nl = self._mm.find(b'\n', pos)
+            if nl < 0:
+                return self.size
+            odd ^= self._mm[pos:nl + 1].count(quote) & 1
+            pos = nl + 1
+            if not odd:
+                return pos
+
+    def _split(self):
+        """Newline-aligned (start, end) byte ranges by quote counting, cached."""
+        if self._ranges is None:
+            self._ranges = []
+            start = self.data_start
+            while start < self.size:
+                end = self._boundary(start, start + self.chunk_bytes)
+                self._ranges.append((start, end))
+                start = end
+        return self._ranges
+
+    def ranges(self):
+        """Quote-safe (start, end) byte ranges covering the data rows; one range if the file cannot be split."""
+        return self._split() if self.splittable else [(self.data_start, self.size)]
+
+    def _records(self):
+        """
+        Stream the data rows through one csv.reader.
+
+        A full pass also notes whether every record (blank ones included) sat
+        on a line of its own, which lets rows_at() skip parsing the others.
+        """
+        with open(self.path, 'r', encoding=self.encoding, newline='') as f:
+            reader = csv.reader(f, **self.dialect)
+            next(reader, None)
+            header_lines = reader.line_num
+            counter = count()
+            yield from map(itemgetter(0), zip(reader, counter))
+            self._header_lines = header_lines
+            self._one_line = reader.line_num - header_lines == next(counter)
+
+    def batches(self):
+        """Yield a Batch of up to STREAM_ROWS padded tuples at a time, in file order."""
+        records = self._records()
+        row_num = 2
+        while True:
+            rows = _padded_tuples(islice(records, STREAM_ROWS), self.width)
+            if not rows:
+                return
+            yield Batch(row_num, rows)
+            row_num += len(rows)
+
+    def columnar(self):
+        """Yield (first_row, columns) per batch, one tuple per column."""
+        for batch in self.batches():
+            yield batch.first_row, batch.columns()
+
+    def rows(self):
+        """Yield padded row tuples in file order."""
+        return chain.from_iterable(batch.rows for batch in self.batches())
+
+    def _run(self, func, args, workers):
+        """Yield (row count, func result) per parse unit in file order, on a pool when workers > 1."""
+        workers = os.cpu_count() if workers is None else workers
+        if workers > 1 and self.splittable and len(self._split()) > 1:
+            yield from self._run_pool(func, args, workers)
+            return
+        # Inline: one stream, reduced STREAM_ROWS rows at a time
+        rows = _padded(self._records(), self.width)
+        while True:
+            count, result = _reduce(islice(rows, STREAM_ROWS), func, args)
+            if not count:
+                return
+            yield count, result
+
+    def _run_pool(self, func, args, workers):
+        ranges = self._split()
+        counts = []
+        # Keep up to 2 x workers ranges in flight so results stream back in order
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for start, end in ranges:
+                pending.append(pool.submit(_scan_range, self.path, start, end, self.encoding,
+                                           self.dialect, self.width, func, args))
+                if len(pending) >= 2 * workers:
+                    count, result = pending.popleft().result()
+                    counts.append(count)
+                    yield count, result
+            while pending:
+                count, result = pending.popleft().result()
+                counts.append(count)
+                yield count, result
+        self.chunk_rows = counts
+
+    def map(self, func, *args, workers=1):
+        """
+        Run func(rows, *args) over the file, inline or split across a pool of workers processes.
+
+        rows is an iterator of padded rows that func must consume completely;
+        it may be called several times, once per STREAM_ROWS rows or per byte
+        range. func must be a module-level function so it can be pickled;
+        returning a compact result (digests, counts) instead of the rows is
+        what makes the pool pay off, as only the results travel back from the
+        workers. The file is only split (and checked for bare quotes) when
+        workers > 1.
+
+        Returns:
+            Iterator of (first_row, row_count, result) in file order
+        """
+        row_num = 2
+        for count, result in self._run(func, args, workers):
+            yield row_num, count, result
+            row_num += count
+
+    def rows_at(self, row_nums):
+        """
+        Return {row_num: row tuple} for the given row numbers.
+
+        After a map() split across workers, only the ranges holding the rows
+        are parsed again; otherwise the file is streamed from the start, and
+        if the last full pass found one record per line, only the wanted lines
+        are parsed. Either way reading stops after the last wanted row.
+        """
+        wanted = set(row_nums)
+        found = {}
+        padding = [''] * self.width
+        if not wanted:
+            return found
+        if self.chunk_rows is None:
+            last = max(wanted)
+            if self._one_line:
+                with open(self.path, 'r', encoding=self.encoding, newline='') as f:
+                    # Blank lines are the rows csv.reader yields as []
+                    lines = filter(None, map(methodcaller('rstrip', '\r\n'), islice(f, self._header_lines, None)))
+                    for row_num, line in enumerate(lines, start=2):
+                        if row_num in wanted:
+                            row = next(csv.reader([line], **self.dialect))
+                            found[row_num] = tuple((row + padding)[:self.width])
+                            if row_num >= last:
+                                break
+                return found
+            for row_num, row in enumerate(filter(None, self._records()), start=2):
+                if row_num in wanted:
+                    found[row_num] = tuple((row + padding)[:self.width])
+                    if row_num >= last:
+                        break
+            return found
+        first = 2
+        for (start, end), count in zip(self._split(), self.chunk_rows):
+            here = {n - first for n in wanted if first <= n < first + count} if count else None
+            if here:
+                last = max(here)
+                records = filter(None, _reader(self._mm[start:end], self.encoding, self.dialect))
+                for offset, row in enumerate(records):
+                    if offset in here:
+                        found[first + offset] = tuple((row + padding)[:self.width])
+                        if offset == last:
+                            break
+            first += count
+        return found
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Scan a CSV file and report sniffed settings and throughput.')
+    parser.add_argument('filename', help='CSV file to scan')
+    parser.add_argument('--workers', type=int, default=1, help='Parser processes (default: 1, i.e. inline)')
+    parser.add_argument('--chunk-mb', type=float, default=CHUNK_BYTES / (1024 * 1024),
+                        help='Target chunk size in MB (default: 8)')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    start = time.perf_counter()
+    with CSVScanner(args.filename, chunk_bytes=int(args.chunk_mb * 1024 * 1024)) as scanner:
+        rows = sum(count for _, count, _ in scanner.map(_drain, workers=args.workers))
+        elapsed = time.perf_counter() - start
+        chunks = f"  chunks: {len(scanner.ranges())}" if args.workers > 1 else ''
+        print(f"Encoding: {scanner.encoding}  delimiter: {scanner.dialect['delimiter']!r}  "
+              f"columns: {scanner.width}{chunks}")
+        print(f"Rows: {rows}  in {elapsed:.2f}s ({rows / elapsed if elapsed else 0:,.0f} rows/sec)")
@@ -1,85 +1,729 @@
 #!/usr/bin/env python3
 """
 Simple script to import data from input.csv into a SQLite database.
+
+Usage:
+    python csv_to_sqlite.py                       # input.csv -> database.db
+    python csv_to_sqlite.py input.csv --index CusNo --index InvNo
+    python csv_to_sqlite.py input.csv --infer-types   # typed columns, money in cents
+    python csv_to_sqlite.py input.csv --sync --key CusNo --key InvNo   # upsert only the delta
+    python csv_to_sqlite.py input.csv --fts       # also index the notes columns for search
+    python csv_to_sqlite.py --search "dispute*"       # ranked notes search, no import
 """
 
+import argparse
 import sqlite3
-import csv
+import hashlib
+import re
+import time
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
+from itertools import chain, islice
+from operator import itemgetter
+
+from csv_scanner import CSVScanner
+
+# PRAGMAs applied for the duration of a load, then restored.
+BULK_PRAGMAS = {
+    'journal_mode': 'MEMORY',
+    'synchronous': 'OFF',
+    'cache_size': -200000,  # negative = KiB, so ~200 MB of page cache
+}
+
+
+# Rows sampled by infer_column_types, and columns always indexed on a typed load.
+SAMPLE_ROWS = 10000
+DEFAULT_INDEX_COLUMNS = ('CusNo', 'InvNo')
+DEFAULT_SYNC_KEY = ('CusNo', 'InvNo')
+NOTES_COLUMNS = ('Comment', 'Auto_Notes', 'ManualNotes', 'InvoiceComment_Item', 'Review')
+MONEY_COLUMNS = ('Balance',)  # stored as cents even when the sample only holds whole dollars
+
+# Leading zeros (e.g. CusNo 0000048) stay text; so do integers past 18 digits
+# (card numbers, long IDs), which would overflow a SQLite INTEGER.
+INT_RE = re.compile(r'^-?(0|[1-9][0-9]{0,17})$')
+DECIMAL_RE = re.compile(r'^-?[0-9]*\.([0-9]+)$')
+# Commas count only as thousands separators; '3,45' (a decimal comma) or '1,2,3' stay text
+THOUSANDS_RE = re.compile(r'^-?[0-9]{1,3}(,[0-9]{3})+(\.[0-9]+)?$')
+DATE_RE = re.compile(r'^([0-9]{1,2})/([0-9]{1,2})/([0-9]{4})(?: ([0-9]{1,2}):([0-9]{2})(?::([0-9]{2}))?)?$')
+
+# Inferred kind -> SQLite column type
+SQL_TYPES = {
+    'integer': 'INTEGER',
+    'money': 'INTEGER',   # stored as integer cents in "<column>_cents"
+    'real': 'REAL',
+    'date': 'TEXT',       # ISO 8601 YYYY-MM-DD, sorts and compares correctly
+    'datetime': 'TEXT',   # ISO 8601 YYYY-MM-DD HH:MM[:SS]
+    'text': 'TEXT',
+}
+
 
-def import_csv_to_sqlite(csv_file='input.csv', db_file='database.db', table_name='invoices'):
+def _numeric_text(value):
+    """Normalize accounting formats: '(502.61)' -> '-502.61', drop '$' and thousands commas."""
+    value = value.replace('$', '')
+    if value.startswith('(') and value.endswith(')'):
+        value = '-' + value[1:-1]
+    if ',' in value and THOUSANDS_RE.match(value):
+        value = value.replace(',', '')
+    return value
+
+
+def infer_column_types(sample, headers=None, money_columns=MONEY_COLUMNS):
+    """
+    Infer a kind for each column from a sample of (padded) rows.
+
+    Kinds: 'empty' (no values in the sample), 'integer', 'money' (decimals
+    with at most two places), 'real', 'date' / 'datetime' (M/D/YYYY with an
+    optional time), or 'text'. Numeric columns named in money_columns are
+    'money' even when the sample holds only whole numbers.
     """
-    Import CSV data into SQLite database.
-    
+    kinds = []
+    for values in zip(*sample) if sample else ():
+        values = [v.strip() for v in values if v.strip()]
+        if not values:
+            kinds.append('empty')
+            continue
+
+        numbers = [_numeric_text(v) for v in values]
+        is_int = [INT_RE.match(v) is not None for v in numbers]
+        decimals = [DECIMAL_RE.match(v) for v in numbers]
+        if all(is_int):
+            kinds.append('integer')
+        elif all(i or d for i, d in zip(is_int, decimals)):
+            places = max(len(d.group(1)) for d in decimals if d)
+            kinds.append('money' if places <= 2 else 'real')
+        else:
+            dates = [DATE_RE.match(v) for v in values]
+            if all(dates):
+                kinds.append('datetime' if any(d.group(4) for d in dates) else 'date')
+            else:
+                kinds.append('text')
+    if headers:
+        kinds = ['money' if kind == 'integer' and header in money_columns else kind
+                 for header, kind in zip(headers, kinds)]
+    return kinds
+
+
+def _is_money(value):
+    match = DECIMAL_RE.match(_numeric_text(value.strip()))
+    return match is not None and len(match.group(1)) <= 2
+
+
+def _to_integer(value):
+    value = _numeric_text(value)
+    if not INT_RE.match(value):
+        raise ValueError(f'not an integer that fits SQLite: {value}')
+    return int(value)
+
+
+def _to_cents(value):
+    return int((Decimal(_numeric_text(value)) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def _to_real(value):
+    return float(_numeric_text(value))
+
+
+@lru_cache(maxsize=65536)  # extracts repeat the same few hundred dates
+def _to_date(value):
+    month, day, year, hour, minute, second = DATE_RE.match(value).groups()
+    iso = f'{year}-{int(month):02d}-{int(day):02d}'
+    if hour is not None:
+        iso += f' {int(hour):02d}:{minute}'
+        if second is not None:
+            iso += f':{second}'
+    return iso
+
+
+CONVERTERS = {
+    'integer': _to_integer,
+    'money': _to_cents,
+    'real': _to_real,
+    'date': _to_date,
+    'datetime': _to_date,
+}
+
+
+class TypedLoader:
+    """Converts padded CSV rows to typed tuples for the inferred schema."""
+
+    def __init__(self, headers, kinds):
+        self.headers = headers
+        self.kinds = kinds
+        self.kept = [i for i, kind in enumerate(kinds) if kind != 'empty']
+        self.dropped = [i for i, kind in enumerate(kinds) if kind == 'empty']
+        self.fallbacks = 0
+
+    def _name(self, i):
+        return f'{self.headers[i]}_cents' if self.kinds[i] == 'money' else self.headers[i]
+
+    def column_names(self):
+        return [self._name(i) for i in self.kept]
+
+    def columns_def(self):
+        return ', '.join(f'"{self._name(i)}" {SQL_TYPES[self.kinds[i]]}' for i in self.kept)
+
+    def insert_sql(self, table_name):
+        columns = ', '.join(f'"{name}"' for name in self.column_names())
+        placeholders = ', '.join(['?'] * len(self.kept))
+        return f'INSERT INTO {table_name} ({columns}) VALUES ({placeholders})'
+
+    def _integer_to_cents(self, i, cursor, table_name):
+        column = self.headers[i]
+        print(f"Column {column} has cents beyond the sample; storing it as {column}_cents")
+        # DROP COLUMN refuses an indexed column: drop its indexes and rebuild them on the new column
+        rebuild = []
+        for _, index, unique, origin, _ in cursor.execute(f'PRAGMA index_list({table_name})').fetchall():
+            columns = [r[2] for r in cursor.execute(f'PRAGMA index_info("{index}")')]
+            if origin == 'c' and column in columns:
+                cursor.execute(f'DROP INDEX "{index}"')
+                rebuild.append((index, unique, [f'{c}_cents' if c == column else c for c in columns]))
+        cursor.execute(f'ALTER TABLE {table_name} ADD COLUMN "{column}_cents" INTEGER')
+        cursor.execute(f'''UPDATE {table_name} SET "{column}_cents" =
+                           CASE WHEN typeof("{column}") = 'integer' THEN "{column}" * 100 ELSE "{column}" END''')
+        cursor.execute(f'ALTER TABLE {table_name} DROP COLUMN "{column}"')
+        for index, unique, columns in rebuild:
+            column_list = ', '.join(f'"{c}"' for c in columns)
+            cursor.execute(f'CREATE {"UNIQUE " if unique else ""}INDEX "{index}" ON {table_name} ({column_list})')
+        self.kinds[i] = 'money'
+
+    def describe(self):
+        typed = [f'{self._name(i)}:{self.kinds[i]}' for i in self.kept if self.kinds[i] != 'text']
+        print(f"Inferred types: {', '.join(typed) or '(all text)'}")
+        if self.dropped:
+            print(f"Dropping {len(self.dropped)} empty columns: {', '.join(self.headers[i] for i in self.dropped)}")
+
+    def _converter(self, kind):
+        if kind == 'text':
+            return lambda value: value or None
+
+        parse = CONVERTERS[kind]
+
+        def convert(value):
+            value = value.strip()
+            if not value:
+                return None
+            try:
+                return parse(value)
+            except (ValueError, ArithmeticError, AttributeError):
+                self.fallbacks += 1
+                return value
+
+        return convert
+
+    def convert(self, batch, cursor, table_name):
+        """
+        Convert a batch.
+
+        A dropped column that turns out to hold data is added back as TEXT; an
+        integer column that turns out to hold cents is moved to "<column>_cents",
+        multiplying the rows already loaded by 100, so one column never mixes units.
+        """
+        # Only rows with something in a dropped column need a closer look
+        suspects = []
+        if self.dropped:
+            get_dropped = itemgetter(*self.dropped, self.dropped[0])  # always returns a tuple
+            suspects = [row for row in batch if any(get_dropped(row))]
+        for i in list(self.dropped):
+            if any(row[i].strip() for row in suspects):
+                print(f"Column {self.headers[i]} has data beyond the sample; adding it back as TEXT")
+                cursor.execute(f'ALTER TABLE {table_name} ADD COLUMN "{self.headers[i]}" TEXT')
+                self.kinds[i] = 'text'
+                self.dropped.remove(i)
+                self.kept.append(i)
+
+        for i in self.kept:
+            if self.kinds[i] == 'integer' and any('.' in row[i] and _is_money(row[i]) for row in batch):
+                self._integer_to_cents(i, cursor, table_name)
+
+        plan = [(i, self._converter(self.kinds[i])) for i in self.kept]
+        return [[convert(row[i]) for i, convert in plan] for row in batch]
+
+
+def drop_table(cursor, table_name):
+    """Drop a table along with its notes index (<table_name>_fts), which would otherwise
+    point at the rowids of whatever is loaded next; the index triggers go with the table."""
+    cursor.execute(f'DROP TABLE IF EXISTS "{table_name}_fts"')
+    cursor.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+
+
+def clean_header_names(headers):
+    """Turn raw CSV headers into SQLite-safe column names."""
+    clean_headers = []
+    for header in headers:
+        # Replace spaces and special characters with underscores
+        clean_header = header.strip().replace(' ', '_').replace('?', '').replace('/', '_').replace(',', '').replace(':', '').replace('.', '').replace('-', '_')
+        # Remove any remaining problematic characters
+        clean_header = ''.join(c if c.isalnum() or c == '_' else '_' for c in clean_header)
+        clean_headers.append(clean_header or f'column_{len(clean_headers)}')
+    return clean_headers
+
+
+def import_csv_to_sqlite(csv_file='input.csv', db_file='database.db', table_name='invoices',
+                         batch_size=50000, index_columns=(), infer_types=False, sample_rows=SAMPLE_ROWS):
+    """
+    Import CSV data into SQLite database, in batched executemany chunks.
+
+    The whole load runs in one transaction with load-time PRAGMAs
+    (journal_mode, synchronous, cache_size); the previous settings are
+    restored afterwards. Indexes are built after the rows are in.
+
+    With infer_types, column types are inferred from the first sample_rows
+    rows (see infer_column_types), empty values are stored as NULL, rows
+    with every field empty are skipped, and CusNo/InvNo are indexed in
+    addition to index_columns.
+
     Args:
         csv_file: Path to the CSV file
         db_file: Path to the SQLite database file
         table_name: Name of the table to create
+        batch_size: Rows per executemany call
+        index_columns: Column names (after header cleanup) to index once loaded
+        infer_types: Infer INTEGER/REAL/ISO-date/cents columns and drop empty ones
+        sample_rows: Rows sampled for type inference
+
+    Returns:
+        Number of rows imported
     """
     print(f"Reading data from {csv_file}...")
-    
-    # Connect to SQLite database (creates it if it doesn't exist)
-    conn = sqlite3.connect(db_file)
+    start = time.perf_counter()
+
+    conn = sqlite3.connect(db_file, isolation_level=None)  # manage the transaction explicitly
     cursor = conn.cursor()
-    
-    # Read CSV file
-    with open(csv_file, 'r', encoding='utf-8') as f:
-        csv_reader = csv.reader(f)
-        
-        # Get headers from first row
-        headers = next(csv_reader)
-        
-        # Clean up header names (remove special characters, spaces, etc.)
-        clean_headers = []
-        for header in headers:
-            # Replace spaces and special characters with underscores
-            clean_header = header.strip().replace(' ', '_').replace('?', '').replace('/', '_').replace(',', '').replace(':', '').replace('.', '').replace('-', '_')
-            # Remove any remaining problematic characters
-            clean_header = ''.join(c if c.isalnum() or c == '_' else '_' for c in clean_header)
-            clean_headers.append(clean_header or f'column_{len(clean_headers)}')
-        
-        print(f"Found {len(clean_headers)} columns: {', '.join(clean_headers[:5])}...")
-        
-        # Drop table if it exists
-        cursor.execute(f'DROP TABLE IF EXISTS {table_name}')
-        
-        # Create table with all columns as TEXT type
+
+    saved_pragmas = {name: cursor.execute(f'PRAGMA {name}').fetchone()[0] for name in BULK_PRAGMAS}
+    for name, value in BULK_PRAGMAS.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+    row_count = 0
+    blank_rows = 0
+    try:
+        with CSVScanner(csv_file) as scanner:
+            clean_headers = clean_header_names(scanner.headers)
+            width = len(clean_headers)
+            print(f"Found {width} columns: {', '.join(clean_headers[:5])}...")
+            rows = scanner.rows()
+
+            if infer_types:
+                sample = list(islice(rows, sample_rows))
+                loader = TypedLoader(clean_headers, infer_column_types(sample, clean_headers))
+                loader.describe()
+                rows = chain(sample, rows)
+                index_columns = list(index_columns) + [c for c in DEFAULT_INDEX_COLUMNS if c not in index_columns]
+            else:
+                loader = None
+
+            cursor.execute('BEGIN')
+            drop_table(cursor, table_name)
+            if loader:
+                columns_def = loader.columns_def()
+            else:
+                columns_def = ', '.join([f'"{header}" TEXT' for header in clean_headers])
+            cursor.execute(f'CREATE TABLE {table_name} ({columns_def})')
+
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                if loader:
+                    kept = [row for row in batch if ''.join(row).strip()]
+                    blank_rows += len(batch) - len(kept)
+                    batch = loader.convert(kept, cursor, table_name)
+                    insert_sql = loader.insert_sql(table_name)
+                else:
+                    insert_sql = f'INSERT INTO {table_name} VALUES ({", ".join(["?"] * width)})'
+                cursor.executemany(insert_sql, batch)
+                row_count += len(batch)
+
+            cursor.execute('COMMIT')
+        load_seconds = time.perf_counter() - start
+
+        column_names = loader.column_names() if loader else clean_headers
+        for column in index_columns:
+            if column not in column_names and f'{column}_cents' in column_names:
+                column = f'{column}_cents'
+            if column not in column_names:
+                print(f"Skipping index on unknown column: {column}")
+                continue
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS "idx_{table_name}_{column}" ON {table_name} ("{column}")')
+            print(f"Created index on {column}")
+    except BaseException:
+        if conn.in_transaction:
+            cursor.execute('ROLLBACK')
+        raise
+    finally:
+        for name, value in saved_pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        conn.close()
+
+    elapsed = time.perf_counter() - start
+    rate = row_count / load_seconds if load_seconds > 0 else float('inf')
+    print(f"\nSuccessfully imported {row_count} rows into {db_file}")
+    if blank_rows:
+        print(f"Skipped {blank_rows} blank rows")
+    if loader and loader.fallbacks:
+        print(f"Values kept as text because they did not match the inferred type: {loader.fallbacks}")
+    print(f"Load: {load_seconds:.2f}s ({rate:,.0f} rows/sec), total with indexes: {elapsed:.2f}s")
+    return row_count
+
+
+def _table_loader(cursor, table_name, clean_headers, key_columns, sample):
+    """
+    TypedLoader matching an existing --infer-types table, or None for an all-TEXT table.
+
+    Kinds come from the table itself: "<column>_cents" is money, INTEGER/REAL
+    columns keep their type, TEXT columns are dates where the sample says so,
+    and columns the typed load dropped stay dropped until they hold data.
+    """
+    declared = {name: col_type.upper() for _, name, col_type, *_ in cursor.execute(f'PRAGMA table_info({table_name})')}
+    data = {name: col_type for name, col_type in declared.items() if not name.startswith('_')}
+    if not any(name.endswith('_cents') or col_type in ('INTEGER', 'REAL') for name, col_type in data.items()):
+        return None
+
+    sampled = infer_column_types(sample, clean_headers)
+    kinds = []
+    for header, guess in zip(clean_headers, sampled):
+        if f'{header}_cents' in data:
+            kinds.append('money')
+        elif data.get(header) == 'INTEGER':
+            kinds.append('integer')
+        elif data.get(header) == 'REAL':
+            kinds.append('real')
+        elif header in data:
+            kinds.append(guess if guess in ('date', 'datetime') else 'text')
+        else:
+            kinds.append('empty')
+    not_text = [c for c in key_columns if kinds[clean_headers.index(c)] != 'text']
+    if not_text:
+        raise ValueError(f"{table_name} stores key column(s) {', '.join(not_text)} as typed values; "
+                         f"sync needs text key columns, pick a different --key")
+    print(f"{table_name} has a typed schema; converting rows like --infer-types")
+    return TypedLoader(clean_headers, kinds)
+
+
+def _row_key(row, key_idx):
+    return '|'.join(row[i].strip() for i in key_idx)
+
+
+def _row_hash(row):
+    return hashlib.blake2b('\x1f'.join(row).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def sync_csv_to_sqlite(csv_file='input.csv', db_file='database.db', table_name='invoices',
+                       key_columns=DEFAULT_SYNC_KEY, delete_missing=False):
+    """
+    Bring a table in line with a fresh CSV extract without reloading it.
+
+    Each row is fingerprinted; only rows whose natural key is new or whose
+    fingerprint changed are upserted. Rows with every key column empty (the
+    blank ",,,," lines at the end of an extract) are skipped. Rows that
+    disappeared from the extract are marked with _removed_at (or deleted
+    with delete_missing). Every change is recorded in <table_name>_changes.
+    A table loaded with infer_types keeps its schema: incoming rows are
+    converted the same way (cents, ISO dates, NULL for empty values) before
+    they are upserted.
+
+    Args:
+        csv_file: Path to the CSV file
+        db_file: Path to the SQLite database file
+        table_name: Table to sync (created if missing)
+        key_columns: Column names (after header cleanup) forming the natural key
+        delete_missing: Delete rows missing from the extract instead of marking them
+
+    Returns:
+        Dict of change counts
+    """
+    print(f"Syncing {csv_file} into {table_name}...")
+    start = time.perf_counter()
+    synced_at = datetime.now().isoformat(timespec='seconds')
+    log_table = f'{table_name}_changes'
+
+    conn = sqlite3.connect(db_file, isolation_level=None)
+    cursor = conn.cursor()
+    try:
+        with CSVScanner(csv_file) as scanner:
+            clean_headers = clean_header_names(scanner.headers)
+            missing = [c for c in key_columns if c not in clean_headers]
+            if missing:
+                raise ValueError(f"Key column(s) not in {csv_file}: {', '.join(missing)}")
+            key_idx = [clean_headers.index(c) for c in key_columns]
+
+            # Last occurrence of a key wins; the rest is counted as duplicate keys
+            incoming = {}
+            file_rows = 0
+            blank_key = _row_key([''] * len(clean_headers), key_idx)
+            blank_keys = 0
+            for row in scanner.rows():
+                key = _row_key(row, key_idx)
+                if key == blank_key:
+                    blank_keys += 1
+                    continue
+                incoming[key] = row
+                file_rows += 1
+
+        cursor.execute('BEGIN')
         columns_def = ', '.join([f'"{header}" TEXT' for header in clean_headers])
-        create_table_sql = f'CREATE TABLE {table_name} ({columns_def})'
-        cursor.execute(create_table_sql)
-        print(f"Created table: {table_name}")
-        
-        # Prepare INSERT statement
-        placeholders = ', '.join(['?' for _ in clean_headers])
-        insert_sql = f'INSERT INTO {table_name} VALUES ({placeholders})'
-        
-        # Insert data
-        row_count = 0
-        for row in csv_reader:
-            # Pad row with empty strings if it has fewer columns than headers
-            while len(row) < len(clean_headers):
-                row.append('')
-            # Truncate row if it has more columns than headers
-            row = row[:len(clean_headers)]
-            
-            cursor.execute(insert_sql, row)
-            row_count += 1
-            
-            # Print progress every 1000 rows
-            if row_count % 1000 == 0:
-                print(f"Inserted {row_count} rows...")
-        
-        # Commit changes
-        conn.commit()
-        print(f"\nSuccessfully imported {row_count} rows into {db_file}")
-        
-        # Show some statistics
-        cursor.execute(f'SELECT COUNT(*) FROM {table_name}')
-        total_rows = cursor.fetchone()[0]
-        print(f"Total rows in database: {total_rows}")
-    
-    # Close connection
-    conn.close()
-    print(f"Database connection closed. Data saved to {db_file}")
+        cursor.execute(f'CREATE TABLE IF NOT EXISTS {table_name} ({columns_def})')
+        loader = _table_loader(cursor, table_name, clean_headers, key_columns,
+                               list(islice(incoming.values(), SAMPLE_ROWS)))
+        existing_columns = [r[1] for r in cursor.execute(f'PRAGMA table_info({table_name})')]
+        data_columns = [] if loader else clean_headers  # a typed table keeps its own schema
+        for column in data_columns + ['_row_key', '_row_hash', '_synced_at', '_removed_at']:
+            if column not in existing_columns:
+                cursor.execute(f'ALTER TABLE {table_name} ADD COLUMN "{column}" TEXT')
+        if '_row_key' not in existing_columns:
+            # Table came from a full import: backfill keys once; hashes stay NULL so rows refresh.
+            # Rows with an empty key keep a NULL _row_key, which sync never matches or removes.
+            trimmed = [f'trim(coalesce("{c}", \'\'))' for c in key_columns]
+            key_sql = " || '|' || ".join(trimmed)
+            has_key = ' OR '.join(f"{t} != ''" for t in trimmed)
+            cursor.execute(f'UPDATE {table_name} SET _row_key = {key_sql} WHERE {has_key}')
+        try:
+            cursor.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS "ux_{table_name}_row_key" ON {table_name} (_row_key)')
+        except sqlite3.IntegrityError:
+            raise ValueError(f"{table_name} already holds duplicate {'+'.join(key_columns)} keys; "
+                             f"sync into a new table or pick a different --key") from None
+        # Covering index so the fingerprint scan below never touches the table itself
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS "idx_{table_name}_row_hash" '
+                       f'ON {table_name} (_row_key, _row_hash, _removed_at)')
+        cursor.execute(f"""CREATE TABLE IF NOT EXISTS {log_table} (
+            synced_at TEXT, row_key TEXT, action TEXT, old_hash TEXT, new_hash TEXT)""")
+
+        # Index-only scan of the covering index: key -> (hash, removed_at)
+        current = {key: (row_hash, removed_at) for key, row_hash, removed_at
+                   in cursor.execute(f'SELECT _row_key, _row_hash, _removed_at FROM {table_name} '
+                                     f'WHERE _row_key IS NOT NULL')}
+
+        upserts, log = [], []
+        counts = {'insert': 0, 'update': 0, 'restore': 0, 'remove': 0, 'unchanged': 0}
+        for key, row in incoming.items():
+            new_hash = _row_hash(row)
+            old_hash, removed_at = current.get(key, (None, None))
+            if key not in current:
+                action = 'insert'
+            elif removed_at is not None:
+                action = 'restore'
+            elif old_hash != new_hash:
+                action = 'update'
+            else:
+                counts['unchanged'] += 1
+                continue
+            counts[action] += 1
+            upserts.append(row)
+            log.append((synced_at, key, action, old_hash, new_hash))
+
+        meta = [(key, new_hash, synced_at) for _, key, _, _, new_hash in log]
+        if loader:
+            # Converted like a typed load: cents, ISO dates, NULL for empty values
+            upserts = loader.convert(upserts, cursor, table_name)
+            columns = loader.column_names() + ['_row_key', '_row_hash', '_synced_at']
+        else:
+            columns = clean_headers + ['_row_key', '_row_hash', '_synced_at']
+        upserts = [tuple(row) + extra for row, extra in zip(upserts, meta)]
+        column_list = ', '.join(f'"{c}"' for c in columns)
+        updates = ', '.join(f'"{c}" = excluded."{c}"' for c in columns if c != '_row_key')
+        cursor.executemany(
+            f'INSERT INTO {table_name} ({column_list}, _removed_at) VALUES ({", ".join(["?"] * len(columns))}, NULL) '
+            f'ON CONFLICT (_row_key) DO UPDATE SET {updates}, _removed_at = NULL',
+            upserts,
+        )
+
+        gone = [key for key, (_, removed_at) in current.items() if key not in incoming and removed_at is None]
+        if delete_missing:
+            cursor.executemany(f'DELETE FROM {table_name} WHERE _row_key = ?', ((k,) for k in gone))
+        else:
+            cursor.executemany(f'UPDATE {table_name} SET _removed_at = ? WHERE _row_key = ?',
+                               ((synced_at, k) for k in gone))
+        counts['remove'] = len(gone)
+        log.extend((synced_at, key, 'remove', current[key][0], None) for key in gone)
+        cursor.executemany(f'INSERT INTO {log_table} VALUES (?, ?, ?, ?, ?)', log)
+        cursor.execute('COMMIT')
+    except BaseException:
+        if conn.in_transaction:
+            cursor.execute('ROLLBACK')
+        raise
+    finally:
+        conn.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"Read {file_rows} rows ({file_rows - len(incoming)} duplicate keys, last one kept)")
+    if blank_keys:
+        print(f"Skipped {blank_keys} rows with empty {'+'.join(key_columns)}")
+    print(', '.join(f"{action}: {n}" for action, n in counts.items()))
+    print(f"Sync finished in {elapsed:.2f}s; changes logged to {log_table}")
+    return counts
+
+
+def build_notes_index(db_file='database.db', table_name='invoices', columns=NOTES_COLUMNS, rebuild=False):
+    """
+    Build an FTS5 index over the free-text columns of table_name.
+
+    The index is an external-content FTS5 table (<table_name>_fts) that
+    stores only the search index, not a second copy of the text. Insert,
+    update and delete triggers on the base table keep it in sync, so later
+    --sync runs maintain it automatically and an existing index is left
+    alone unless rebuild is set. A full load drops the index along with the
+    table. Columns missing from the table (e.g. dropped as empty by
+    --infer-types) are skipped.
+
+    Args:
+        db_file: Path to the SQLite database file
+        table_name: Base table holding the notes
+        columns: Free-text columns to index
+        rebuild: Drop and rebuild the index even if it already exists
+
+    Returns:
+        List of indexed columns
+    """
+    fts_table = f'{table_name}_fts'
+    conn = sqlite3.connect(db_file, isolation_level=None)
+    cursor = conn.cursor()
+    try:
+        current = [r[1] for r in cursor.execute(f'PRAGMA table_info("{fts_table}")')]
+        if current and not rebuild:
+            print(f"Full-text index {fts_table} is kept current by triggers; not rebuilt")
+            return current
+
+        existing = [r[1] for r in cursor.execute(f'PRAGMA table_info({table_name})')]
+        if not existing:
+            raise ValueError(f"Table {table_name} not found in {db_file}")
+        indexed = [c for c in columns if c in existing]
+        if not indexed:
+            raise ValueError(f"None of the notes columns exist in {table_name}: {', '.join(columns)}")
+
+        column_list = ', '.join(f'"{c}"' for c in indexed)
+        new_values = ', '.join(f'new."{c}"' for c in indexed)
+        old_values = ', '.join(f'old."{c}"' for c in indexed)
+
+        cursor.execute('BEGIN')
+        for trigger in ('ai', 'ad', 'au'):
+            cursor.execute(f'DROP TRIGGER IF EXISTS "{fts_table}_{trigger}"')
+        cursor.execute(f'DROP TABLE IF EXISTS "{fts_table}"')
+        cursor.execute(f"CREATE VIRTUAL TABLE \"{fts_table}\" USING fts5({column_list}, "
+                       f"content='{table_name}', content_rowid='rowid', tokenize='porter unicode61')")
+        cursor.execute(f"""CREATE TRIGGER "{fts_table}_ai" AFTER INSERT ON {table_name} BEGIN
+            INSERT INTO "{fts_table}"(rowid, {column_list}) VALUES (new.rowid, {new_values});
+        END""")
+        cursor.execute(f"""CREATE TRIGGER "{fts_table}_ad" AFTER DELETE ON {table_name} BEGIN
+            INSERT INTO "{fts_table}"("{fts_table}", rowid, {column_list}) VALUES ('delete', old.rowid, {old_values});
+        END""")
+        cursor.execute(f"""CREATE TRIGGER "{fts_table}_au" AFTER UPDATE ON {table_name} BEGIN
+            INSERT INTO "{fts_table}"("{fts_table}", rowid, {column_list}) VALUES ('delete', old.rowid, {old_values});
+            INSERT INTO "{fts_table}"(rowid, {column_list}) VALUES (new.rowid, {new_values});
+        END""")
+        cursor.execute(f'INSERT INTO "{fts_table}"("{fts_table}") VALUES (\'rebuild\')')
+        cursor.execute('COMMIT')
+    except BaseException:
+        if conn.in_transaction:
+            cursor.execute('ROLLBACK')
+        raise
+    finally:
+        conn.close()
+
+    print(f"Built full-text index {fts_table} over: {', '.join(indexed)}")
+    return indexed
+
+
+def search_notes(query, db_file='database.db', table_name='invoices', limit=20):
+    """
+    Full-text search over the notes index built by build_notes_index.
+
+    Args:
+        query: FTS5 query, e.g. 'dispute', 'dispute OR disputed', '"credit card"', 'disput*'
+        db_file: Path to the SQLite database file
+        table_name: Base table the index was built on
+        limit: Maximum matches to return
+
+    Returns:
+        List of dicts with CusNo, InvNo (when present), rank and a highlighted snippet, best match first
+    """
+    fts_table = f'{table_name}_fts'
+    conn = sqlite3.connect(db_file)
+    try:
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts_table,)).fetchone():
+            raise ValueError(f"No notes index {fts_table} in {db_file}; "
+                             f"build it with: python csv_to_sqlite.py <file> --fts")
+        existing = [r[1] for r in conn.execute(f'PRAGMA table_info({table_name})')]
+        key_columns = [c for c in DEFAULT_SYNC_KEY if c in existing]
+        key_select = ''.join(f't."{c}", ' for c in key_columns)
+        # Rank and limit inside the FTS table first; snippets and the join only run for the top matches
+        rows = conn.execute(
+            f'SELECT {key_select}t.rowid, m.rank, '
+            f'snippet("{fts_table}", -1, \'[\', \']\', \'...\', 12) '
+            f'FROM (SELECT rowid, rank FROM "{fts_table}" WHERE "{fts_table}" MATCH ?1 ORDER BY rank LIMIT ?2) m '
+            f'JOIN "{fts_table}" ON "{fts_table}".rowid = m.rowid AND "{fts_table}" MATCH ?1 '
+            f'JOIN {table_name} t ON t.rowid = m.rowid ORDER BY m.rank',
+            (query, limit),
+        ).fetchall()
+    finally:
+        conn.close()
+
+    results = []
+    for row in rows:
+        match = dict(zip(key_columns, row))
+        match.update({'rowid': row[-3], 'rank': row[-2], 'snippet': row[-1]})
+        results.append(match)
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Import a CSV file into a SQLite table.')
+    parser.add_argument('csv_file', nargs='?', default='input.csv', help='CSV file to import (default: input.csv)')
+    parser.add_argument('--db', default='database.db', help='SQLite database file (default: database.db)')
+    parser.add_argument('--table', default='invoices', help='Table name (default: invoices)')
+    # Every load is batched now; --bulk is still accepted so existing scripts keep working
+    parser.add_argument('--bulk', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--batch-size', type=int, default=50000, help='Rows per insert batch (default: 50000)')
+    parser.add_argument('--index', action='append', default=[], metavar='COLUMN',
+                        help='Column to index after the load (repeatable)')
+    parser.add_argument('--infer-types', action='store_true',
+                        help='Load with inferred column types, store money as cents, drop empty columns')
+    parser.add_argument('--sample-rows', type=int, default=SAMPLE_ROWS,
+                        help=f'Rows sampled for type inference (default: {SAMPLE_ROWS})')
+    parser.add_argument('--sync', action='store_true',
+                        help='Upsert new/changed rows by natural key instead of reloading the table')
+    parser.add_argument('--key', action='append', metavar='COLUMN',
+                        help=f'Natural key column for --sync (repeatable, default: {" ".join(DEFAULT_SYNC_KEY)})')
+    parser.add_argument('--delete-missing', action='store_true',
+                        help='With --sync, delete rows missing from the extract instead of marking _removed_at')
+    parser.add_argument('--fts', action='store_true',
+                        help='Build the FTS5 notes index after importing if missing (kept in sync by triggers)')
+    parser.add_argument('--search', metavar='QUERY',
+                        help='Search the notes index instead of importing (FTS5 syntax, e.g. "dispute*")')
+    parser.add_argument('--limit', type=int, default=20, help='Maximum search results (default: 20)')
+    return parser.parse_args()
+
+
+def run_search(args):
+    start = time.perf_counter()
+    try:
+        matches = search_notes(args.search, args.db, args.table, limit=args.limit)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    except sqlite3.OperationalError as e:
+        # FTS5 syntax errors: a bare '-' or ':' reads as a column filter ("no such column: card")
+        print(f"Error: could not run search {args.search!r}: {e}")
+        print('Put terms with punctuation in double quotes, e.g. --search \'"credit-card"\'')
+        return
+    # bm25 ranks on a large table are tiny negative numbers; the order is what matters
+    for position, match in enumerate(matches, start=1):
+        key = ' '.join(str(match[c]) for c in DEFAULT_SYNC_KEY if c in match)
+        print(f"{position:4d}.  {key}  {match['snippet']}")
+    print(f"{len(matches)} matches in {(time.perf_counter() - start) * 1000:.1f} ms")
+
 
 if __name__ == '__main__':
-    import_csv_to_sqlite()
+    args = parse_args()
+    if args.search:
+        run_search(args)
+    else:
+        if args.sync:
+            sync_csv_to_sqlite(args.csv_file, args.db, args.table,
+                               key_columns=args.key or DEFAULT_SYNC_KEY, delete_missing=args.delete_missing)
+        else:
+            import_csv_to_sqlite(args.csv_file, args.db, args.table,
+                                 batch_size=args.batch_size, index_columns=args.index,
+                                 infer_types=args.infer_types, sample_rows=args.sample_rows)
+        if args.fts:
+            build_notes_index(args.db, args.table)
@@ -1,40 +1,155 @@
 #!/usr/bin/env python3
-"""Find duplicate rows in a CSV file, ignoring the invoice column."""
+"""Find duplicate rows in a CSV file, ignoring the invoice column.
 
+Runs in two streaming passes so memory stays bounded on multi-GB extracts:
+the first pass keeps only a fixed-size digest per distinct key and the row
+numbers of duplicates; the second pass parses again only the rows (or, with
+multi-line records, the chunks) that belong to a duplicate group, confirming
+each match on the full key.
+The file is read through csv_scanner.CSVScanner; with --workers N the chunks
+are parsed and digested on N processes and only the digests come back.
+
+With --history, rows are instead checked against a persistent fingerprint
+index (SQLite) of every previously processed file, so a row that was already
+billed in an earlier month's extract is reported with its original file and
+row. Each checked file is then added to the index.
+
+With --near, rows that are close but not identical (a date off by a day, a
+comment that differs only in case or whitespace, ...) are found by blocking
+candidates on (customer, amount in cents) and/or MinHash/LSH over the notes
+columns, then scoring only pairs within a block. Scored pairs go to
+near_duplicates_<file>.csv.
+
+Usage:
+    python find_duplicates.py input.csv
+    python find_duplicates.py input.csv --ignore InvNo --ignore QryRunTime
+    python find_duplicates.py input.csv --key CusNo --key Balance --key InvDueDate
+    python find_duplicates.py november.csv --history fingerprints.db
+    python find_duplicates.py input.csv --near --blocking both --threshold 0.9
+"""
+
+import argparse
 import csv
+import hashlib
+import random
+import re
+import sqlite3
 import sys
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import combinations, islice
+from operator import itemgetter
 from pathlib import Path
 
+from csv_scanner import CSVScanner
+
+HISTORY_BATCH = 500  # digests looked up per query against the history index
+
+# Near-duplicate defaults
+NEAR_CUSTOMER_COLUMN = 'CusNo'
+NEAR_AMOUNT_COLUMN = 'Balance'
+NEAR_TEXT_COLUMNS = ('Comment', 'Auto_Notes', 'ManualNotes', 'InvoiceComment_Item', 'Review')
+NEAR_MAX_BLOCK = 100        # blocks larger than this are skipped to keep pair scoring near-linear
+MINHASH_PERMUTATIONS = 16
+MINHASH_BANDS = 8           # 8 bands x 2 rows: ~90% chance to pair rows with Jaccard 0.5
+
+DATE_RE = re.compile(r'^(\d{1,2})/(\d{1,2})/(\d{4})(?:\s.*)?$|^(\d{4})-(\d{2})-(\d{2})(?:[ T].*)?$')
+
+
+def key_digest(values):
+    """8-byte digest of a key; collisions are ruled out when rows are re-read."""
+    joined = '\x1f'.join(values).encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(joined, digest_size=8).digest(), sys.byteorder)
+
+
+def _key_digests(rows, key_idx):
+    """
+    key_digest for every row of a batch, packed into one bytes object (cheap to
+    send back from a worker); read it back with memoryview(...).cast('Q').
+    """
+    blake2b = hashlib.blake2b
+    if len(key_idx) == 1:
+        col = key_idx[0]
+        keys = (row[col].strip() for row in rows)
+    else:
+        get = itemgetter(*key_idx)
+        join = '\x1f'.join
+        keys = (join(map(str.strip, get(row))) for row in rows)
+    return b''.join([blake2b(key.encode('utf-8'), digest_size=8).digest() for key in keys])
+
 
-def find_duplicates(filename, invoice_column='InvNo'):
-    """Find duplicate rows in a CSV file, ignoring the invoice column."""
+def history_digest(values):
+    """128-bit digest as two signed 64-bit ints (SQLite INTEGER range) for the history index."""
+    joined = '\x1f'.join(values).encode('utf-8')
+    digest = hashlib.blake2b(joined, digest_size=16).digest()
+    return int.from_bytes(digest[:8], 'little', signed=True), int.from_bytes(digest[8:], 'little', signed=True)
+
+
+def _columns_to_check(fieldnames, invoice_column, key_columns, ignore_columns):
+    """Key columns for a file, or None (after printing why) if a requested key column is missing."""
+    ignore = set(ignore_columns) if ignore_columns is not None else {invoice_column}
+    if key_columns:
+        unknown = [col for col in key_columns if col not in fieldnames]
+        if unknown:
+            print(f"Error: Key column(s) not in file: {', '.join(unknown)}")
+            return None
+        return [col for col in key_columns if col not in ignore]
+    return [col for col in fieldnames if col not in ignore]
+
+
+def find_duplicates(filename, invoice_column='InvNo', key_columns=None, ignore_columns=None, workers=1):
+    """Find duplicate rows in a CSV file, ignoring the invoice column.
+
+    Args:
+        filename: CSV file to check
+        invoice_column: Column shown as "Invoice" in the details (ignored by default)
+        key_columns: Columns that make up the duplicate key (default: all not ignored)
+        ignore_columns: Columns left out of the key (default: [invoice_column])
+        workers: Processes that parse and digest chunks of the file (default: 1, inline)
+    """
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            
-            if not reader.fieldnames:
+        with CSVScanner(filename) as scanner:
+            fieldnames = scanner.headers
+
+            if not fieldnames:
                 print("Error: Could not read column headers from CSV file.")
                 return
-            
-            fieldnames = list(reader.fieldnames)
-            columns_to_check = [col for col in fieldnames if col != invoice_column]
-            
-            # Track seen rows and all rows
+
+            columns_to_check = _columns_to_check(fieldnames, invoice_column, key_columns, ignore_columns)
+            if columns_to_check is None:
+                return
+            key_idx = [fieldnames.index(col) for col in columns_to_check]
+
+            # Pass 1: digest -> first row number; duplicates remembered by row number only.
+            # Chunks are parsed and digested in the workers (if any); only the digests come back.
+            # Rows with nothing in any key column are not records and never count as duplicates.
             seen = {}
-            all_rows = []
-            duplicates = []
-            
-            for row_num, row in enumerate(reader, start=2):
-                all_rows.append((row_num, row))
-                
-                # Create key from all columns except invoice
-                key = tuple(row.get(col, '').strip() for col in columns_to_check)
-                
-                if key in seen:
-                    duplicates.append((row_num, seen[key], row))
-                else:
-                    seen[key] = row_num
-        
+            candidates = {}
+            empty = key_digest([''] * len(key_idx))
+            for first_row, _, digests in scanner.map(_key_digests, key_idx, workers=workers):
+                for row_num, digest in enumerate(memoryview(digests).cast('Q'), start=first_row):
+                    if digest == empty:
+                        continue
+                    orig_row_num = seen.setdefault(digest, row_num)
+                    if orig_row_num != row_num:
+                        candidates[row_num] = orig_row_num
+
+            # Pass 2: re-parse only the rows involved in a duplicate group
+            needed = set(candidates) | set(candidates.values())
+            kept = {row_num: dict(zip(fieldnames, row)) for row_num, row in scanner.rows_at(needed).items()}
+
+        def full_key(row):
+            return tuple(row.get(col, '').strip() for col in columns_to_check)
+
+        # Group duplicates by original row, dropping any digest collisions
+        groups = {}
+        duplicates = []
+        for dup_row_num, orig_row_num in candidates.items():
+            if full_key(kept[dup_row_num]) != full_key(kept[orig_row_num]):
+                continue
+            groups.setdefault(orig_row_num, []).append(dup_row_num)
+            duplicates.append((dup_row_num, orig_row_num, kept[dup_row_num]))
+
         # Print summary
         print(f"\n{'='*70}")
         print(f"Duplicate Analysis for: {filename}")
@@ -42,38 +157,26 @@ def find_duplicates(filename, invoice_column='InvNo'):
         print(f"Total unique row patterns: {len(seen)}")
         print(f"Total duplicates found: {len(duplicates)}")
         print(f"{'='*70}\n")
-        
+
         if duplicates:
             # Write duplicates to CSV
             output_filename = f"duplicates_{Path(filename).stem}.csv"
-            output_rows = []
-            
-            # Group duplicates by original row
-            groups = {}
-            for dup_row_num, orig_row_num, row_data in duplicates:
-                if orig_row_num not in groups:
-                    groups[orig_row_num] = []
-                groups[orig_row_num].append((dup_row_num, row_data))
-            
-            # Build output with original and duplicate rows
-            for group_id, (orig_row_num, group_dups) in enumerate(groups.items(), start=1):
-                # Find original row
-                orig_row = next(row for num, row in all_rows if num == orig_row_num)
-                output_rows.append({'DuplicateGroup': group_id, 'OriginalRow': orig_row_num, **orig_row})
-                
-                # Add duplicate rows
-                for dup_row_num, dup_row in group_dups:
-                    output_rows.append({'DuplicateGroup': group_id, 'OriginalRow': orig_row_num, **dup_row})
-            
-            # Write output file
+            output_count = 0
+
             with open(output_filename, 'w', newline='', encoding='utf-8') as f:
                 writer = csv.DictWriter(f, fieldnames=['DuplicateGroup', 'OriginalRow'] + fieldnames)
                 writer.writeheader()
-                writer.writerows(output_rows)
-            
+
+                # Original row followed by its duplicate rows
+                for group_id, (orig_row_num, dup_row_nums) in enumerate(groups.items(), start=1):
+                    writer.writerow({'DuplicateGroup': group_id, 'OriginalRow': orig_row_num, **kept[orig_row_num]})
+                    for dup_row_num in dup_row_nums:
+                        writer.writerow({'DuplicateGroup': group_id, 'OriginalRow': orig_row_num, **kept[dup_row_num]})
+                    output_count += 1 + len(dup_row_nums)
+
             print(f"✓ Duplicate rows written to: {output_filename}")
-            print(f"  Total rows in output file: {len(output_rows)}\n")
-            
+            print(f"  Total rows in output file: {output_count}\n")
+
             # Print duplicate details
             print("Duplicate rows found:\n")
             for i, (dup_row, orig_row, row_data) in enumerate(duplicates, 1):
@@ -84,7 +187,7 @@ def find_duplicates(filename, invoice_column='InvNo'):
                 print(f"  Sample data: {sample}\n")
         else:
             print("✓ No duplicate rows found (ignoring invoice column)!")
-            
+
     except FileNotFoundError:
         print(f"Error: File '{filename}' not found.")
         sys.exit(1)
@@ -93,6 +196,391 @@ def find_duplicates(filename, invoice_column='InvNo'):
         sys.exit(1)
 
 
+def open_history(history_db):
+    """Open (or create) the fingerprint index; files are identified by content SHA-256, not by name."""
+    conn = sqlite3.connect(history_db)
+    columns = [r[1] for r in conn.execute('PRAGMA table_info(fingerprints)')]
+    if 'source_file' in columns:
+        _upgrade_history(conn)
+    conn.execute("""CREATE TABLE IF NOT EXISTS fingerprints (
+        digest INTEGER PRIMARY KEY, check_digest INTEGER, file_sha TEXT, row_num INTEGER, invoice TEXT)""")
+    conn.execute("""CREATE TABLE IF NOT EXISTS source_files (
+        sha256 TEXT PRIMARY KEY, source_file TEXT, rows INTEGER, key_columns TEXT, indexed_at TEXT)""")
+    return conn
+
+
+def _upgrade_history(conn):
+    """Re-key an index that identified files by name only (two input.csv from different months collided)."""
+    with conn:
+        conn.execute('ALTER TABLE fingerprints RENAME COLUMN source_file TO file_sha')
+        conn.execute("""UPDATE fingerprints SET file_sha =
+                            (SELECT sha256 FROM source_files s WHERE s.source_file = fingerprints.file_sha)
+                        WHERE file_sha IN (SELECT source_file FROM source_files)""")
+        conn.execute('ALTER TABLE source_files RENAME TO source_files_by_name')
+        conn.execute("""CREATE TABLE source_files (
+            sha256 TEXT PRIMARY KEY, source_file TEXT, rows INTEGER, key_columns TEXT, indexed_at TEXT)""")
+        conn.execute("""INSERT OR REPLACE INTO source_files
+                        SELECT sha256, source_file, rows, key_columns, indexed_at FROM source_files_by_name""")
+        conn.execute('DROP TABLE source_files_by_name')
+
+
+def _file_sha256(filename):
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def find_history_duplicates(filename, history_db, invoice_column='InvNo', key_columns=None,
+                            ignore_columns=None, record=True):
+    """Check a CSV file against the fingerprint index of previously processed files.
+
+    Rows are keyed exactly as in find_duplicates (all columns except the
+    invoice column by default, matched by column name). Lookups are batched
+    primary-key probes, so the cost tracks the size of the new file, not the
+    history. Matches are written to history_duplicates_<file>.csv with the
+    original file's path, row and invoice. Files are told apart by content
+    SHA-256, so same-named extracts from different folders are different
+    files, and re-checking an indexed file does not match it against itself.
+    Rows with nothing in any key column are neither matched nor recorded.
+
+    Args:
+        filename: CSV file to check
+        history_db: SQLite file holding the fingerprint index (created if missing)
+        invoice_column: Column reported as the invoice
+        key_columns: Columns that make up the duplicate key (default: all not ignored)
+        ignore_columns: Columns left out of the key (default: [invoice_column])
+        record: Add this file's rows to the index after checking
+    """
+    conn = open_history(history_db)
+    try:
+        source_file = str(Path(filename).resolve())
+        file_sha = _file_sha256(filename)
+        with CSVScanner(filename) as scanner:
+            fieldnames = scanner.headers
+            if not fieldnames:
+                print("Error: Could not read column headers from CSV file.")
+                return
+
+            columns_to_check = _columns_to_check(fieldnames, invoice_column, key_columns, ignore_columns)
+            if columns_to_check is None:
+                return
+            # Sorted by name so extracts with reordered columns still fingerprint alike
+            columns_to_check = sorted(columns_to_check)
+            key_idx = [fieldnames.index(col) for col in columns_to_check]
+            inv_idx = fieldnames.index(invoice_column) if invoice_column in fieldnames else None
+
+            output_filename = f"history_duplicates_{Path(filename).stem}.csv"
+            matches = 0
+            total_rows = 0
+            new_prints = []
+            with open(output_filename, 'w', newline='', encoding='utf-8') as out:
+                writer = csv.writer(out)
+                writer.writerow(['OriginalFile', 'OriginalRow', 'OriginalInvoice', 'Row'] + fieldnames)
+
+                empty = history_digest([''] * len(key_idx))
+                rows = enumerate(scanner.rows(), start=2)
+                while True:
+                    batch = list(islice(rows, HISTORY_BATCH))
+                    if not batch:
+                        break
+                    total_rows += len(batch)
+                    digests = [history_digest([row[i].strip() for i in key_idx]) for _, row in batch]
+                    keyed = [(item, digest) for item, digest in zip(batch, digests) if digest != empty]
+                    batch = [item for item, _ in keyed]
+                    digests = [digest for _, digest in keyed]
+                    placeholders = ', '.join(['?'] * len(digests))
+                    found = {
+                        digest: rest for digest, *rest in conn.execute(
+                            f'SELECT f.digest, f.check_digest, f.file_sha, f.row_num, f.invoice, '
+                            f'coalesce(s.source_file, f.file_sha) '
+                            f'FROM fingerprints f LEFT JOIN source_files s ON s.sha256 = f.file_sha '
+                            f'WHERE f.digest IN ({placeholders})', [d for d, _ in digests])
+                    }
+                    for (row_num, row), (digest, check) in zip(batch, digests):
+                        hit = found.get(digest)
+                        if hit is None:
+                            invoice = row[inv_idx] if inv_idx is not None else ''
+                            new_prints.append((digest, check, file_sha, row_num, invoice))
+                            # first occurrence wins
+                            found[digest] = (check, file_sha, row_num, invoice, source_file)
+                        elif hit[0] == check and hit[1] != file_sha:
+                            writer.writerow([hit[4], hit[2], hit[3], row_num, *row])
+                            matches += 1
+
+        if record:
+            conn.executemany('INSERT OR IGNORE INTO fingerprints VALUES (?, ?, ?, ?, ?)', new_prints)
+            conn.execute('INSERT OR REPLACE INTO source_files VALUES (?, ?, ?, ?, ?)',
+                         (file_sha, source_file, total_rows, '|'.join(columns_to_check),
+                          datetime.now().isoformat(timespec='seconds')))
+            conn.commit()
+        history_files, history_rows = conn.execute('SELECT COUNT(*), SUM(rows) FROM source_files').fetchone()
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+    print(f"\n{'='*70}")
+    print(f"History Duplicate Analysis for: {filename}")
+    print(f"{'='*70}")
+    print(f"Index: {history_db} ({history_files} files, {history_rows or 0} rows indexed)")
+    print(f"Rows matching a previously processed file: {matches}")
+    print(f"New fingerprints {'added' if record else 'not recorded'}: {len(new_prints)}")
+    print(f"{'='*70}\n")
+    if matches:
+        print(f"✓ Matches written to: {output_filename}\n")
+    else:
+        Path(output_filename).unlink(missing_ok=True)
+        print("✓ No rows match previously processed files!")
+
+
+def normalize_text(value):
+    """Case- and whitespace-insensitive form of a field."""
+    return ' '.join(value.split()).casefold()
+
+
+def amount_cents(value):
+    """Cents from '1,234.56', '$12', '(502.61)'; None if not an amount."""
+    value = value.strip().replace(',', '').replace('$', '')
+    if value.startswith('(') and value.endswith(')'):
+        value = '-' + value[1:-1]
+    try:
+        return round(float(value) * 100)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=65536)
+def _as_ordinal(value):
+    match = DATE_RE.match(value)
+    if not match:
+        return None
+    m, d, y, iso_y, iso_m, iso_d = match.groups()
+    try:
+        if y:
+            return date(int(y), int(m), int(d)).toordinal()
+        return date(int(iso_y), int(iso_m), int(iso_d)).toordinal()
+    except ValueError:
+        return None
+
+
+def field_similarity(a, b, date_tolerance):
+    """0..1 similarity of two stripped field values."""
+    if a == b:
+        return 1.0
+    na, nb = normalize_text(a), normalize_text(b)
+    if na == nb:
+        return 1.0
+    da, db = _as_ordinal(a), _as_ordinal(b)
+    if da is not None and db is not None:
+        return max(0.0, 1.0 - abs(da - db) / (date_tolerance + 1))
+    ca, cb = amount_cents(a), amount_cents(b)
+    if ca is not None and cb is not None:
+        return 1.0 if ca == cb else 0.0
+    ta, tb = set(na.split()), set(nb.split())
+    return len(ta & tb) / len(ta | tb) if ta and tb else 0.0
+
+
+class MinHasher:
+    """MinHash signatures over word tokens, split into LSH bands."""
+
+    def __init__(self, permutations=MINHASH_PERMUTATIONS, bands=MINHASH_BANDS, seed=1):
+        if permutations % bands:
+            raise ValueError('permutations must be a multiple of bands')
+        rng = random.Random(seed)
+        self.prime = (1 << 61) - 1
+        self.params = [(rng.randrange(1, self.prime), rng.randrange(self.prime)) for _ in range(permutations)]
+        self.rows_per_band = permutations // bands
+
+    def bands(self, tokens):
+        """One hashable key per band; rows sharing any band key become candidates."""
+        bases = [int.from_bytes(hashlib.blake2b(t.encode('utf-8'), digest_size=8).digest(), 'little')
+                 for t in tokens]
+        signature = [min((a * x + b) % self.prime for x in bases) for a, b in self.params]
+        r = self.rows_per_band
+        return [(band, tuple(signature[band * r:(band + 1) * r])) for band in range(len(signature) // r)]
+
+
+def _block_digests(rows, cust_idx, amount_idx, text_idx, hasher):
+    """Block key digests for every row of a batch (amount blocking when amount_idx is set, MinHash when hasher is)."""
+    result = []
+    for row in rows:
+        customer = row[cust_idx].strip() if cust_idx is not None else ''
+        keys = []
+        if amount_idx is not None:
+            cents = amount_cents(row[amount_idx])
+            if cents is not None:
+                keys.append(('a', customer, cents))
+        if hasher is not None:
+            tokens = set(normalize_text(' '.join(row[i] for i in text_idx)).split())
+            if tokens:
+                keys.extend(('m', customer, band) for band in hasher.bands(tokens))
+        result.append([key_digest([repr(key)]) for key in keys])
+    return result
+
+
+def find_near_duplicates(filename, invoice_column='InvNo', ignore_columns=None, blocking='amount',
+                         customer_column=NEAR_CUSTOMER_COLUMN, amount_column=NEAR_AMOUNT_COLUMN,
+                         text_columns=NEAR_TEXT_COLUMNS, threshold=0.9, date_tolerance=3,
+                         max_block=NEAR_MAX_BLOCK, workers=1):
+    """Find near-duplicate rows by scoring only pairs that share a block.
+
+    Blocking 'amount' groups rows by (customer, amount in cents); 'minhash'
+    groups rows whose notes columns share a MinHash/LSH band (within the same
+    customer when the customer column exists); 'both' uses either. Each pair
+    is scored as the mean field similarity over the non-ignored columns
+    (case/whitespace-insensitive text, dates within date_tolerance days,
+    amounts in cents, token Jaccard otherwise), weighted by how distinct
+    each column is among the candidate rows. Exact duplicates are left to
+    the default mode.
+
+    Args:
+        filename: CSV file to check
+        invoice_column: Column left out of the comparison (like find_duplicates)
+        ignore_columns: Columns left out of the comparison (default: [invoice_column])
+        blocking: 'amount', 'minhash' or 'both'
+        customer_column: Customer column used for blocking
+        amount_column: Amount column used for blocking
+        text_columns: Free-text columns used for MinHash blocking
+        threshold: Minimum score for a pair to be reported
+        date_tolerance: Days within which two dates still count as partly similar
+        max_block: Blocks with more rows than this are skipped (and counted)
+        workers: Processes that parse chunks and compute block keys (default: 1, inline)
+    """
+    if blocking not in ('amount', 'minhash', 'both'):
+        raise ValueError("blocking must be 'amount', 'minhash' or 'both'")
+    try:
+        with CSVScanner(filename) as scanner:
+            fieldnames = scanner.headers
+            if not fieldnames:
+                print("Error: Could not read column headers from CSV file.")
+                return
+
+            ignore = set(ignore_columns) if ignore_columns is not None else {invoice_column}
+            compare_idx = [i for i, col in enumerate(fieldnames) if col not in ignore]
+            cust_idx = fieldnames.index(customer_column) if customer_column in fieldnames else None
+            amount_idx = fieldnames.index(amount_column) if amount_column in fieldnames else None
+            text_idx = [fieldnames.index(col) for col in text_columns if col in fieldnames]
+            use_amount = blocking in ('amount', 'both') and amount_idx is not None
+            use_minhash = blocking in ('minhash', 'both') and text_idx
+            if not (use_amount or use_minhash):
+                print(f"Error: No blocking columns found ({amount_column} / {', '.join(text_columns)}).")
+                return
+            hasher = MinHasher() if use_minhash else None
+
+            # Pass 1: block key digests -> row numbers (keys are computed in the workers)
+            blocks = {}
+            row_count = 0
+            for first_row, count, row_keys in scanner.map(_block_digests, cust_idx, amount_idx if use_amount else None,
+                                                          text_idx, hasher, workers=workers):
+                row_count += count
+                for row_num, digests in enumerate(row_keys, start=first_row):
+                    for digest in digests:
+                        blocks.setdefault(digest, []).append(row_num)
+
+            usable = [members for members in blocks.values() if 2 <= len(members) <= max_block]
+            skipped = sum(1 for members in blocks.values() if len(members) > max_block)
+            del blocks
+
+            # Pass 2: re-parse only the rows that sit in a usable block
+            needed = {row_num for members in usable for row_num in members}
+            kept = {row_num: [v.strip() for v in row] for row_num, row in scanner.rows_at(needed).items()}
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+        sys.exit(1)
+
+    # Weight columns by how distinct their values are among candidate rows, so
+    # constant columns (run time, status, ...) don't make every pair look alike
+    weights = {}
+    if kept:
+        for i in compare_idx:
+            values = [row[i] for row in kept.values() if row[i]]
+            weights[i] = len({normalize_text(v) for v in values}) / len(kept) if values else 0.0
+
+    # Score each candidate pair once
+    scored = {}
+    for members in usable:
+        for a, b in combinations(sorted(members), 2):
+            if (a, b) in scored:
+                continue
+            row_a, row_b = kept[a], kept[b]
+            differing = [fieldnames[i] for i in compare_idx if row_a[i] != row_b[i]]
+            if not differing:
+                scored[(a, b)] = None  # exact duplicate: reported by the default mode
+                continue
+            compared = [i for i in compare_idx if (row_a[i] or row_b[i]) and weights[i]]
+            total_weight = sum(weights[i] for i in compared)
+            score = sum(weights[i] * field_similarity(row_a[i], row_b[i], date_tolerance)
+                        for i in compared) / total_weight if total_weight else 0.0
+            scored[(a, b)] = (score, differing) if score >= threshold else None
+
+    pairs = sorted(((a, b, *result) for (a, b), result in scored.items() if result),
+                   key=lambda p: (-p[2], p[0], p[1]))
+
+    print(f"\n{'='*70}")
+    print(f"Near-Duplicate Analysis for: {filename}")
+    print(f"{'='*70}")
+    print(f"Rows: {row_count}  blocking: {blocking}  threshold: {threshold}")
+    print(f"Candidate pairs scored: {len(scored)}  (blocks over {max_block} rows skipped: {skipped})")
+    print(f"Near-duplicate pairs found: {len(pairs)}")
+    print(f"{'='*70}\n")
+
+    if not pairs:
+        print("✓ No near-duplicate rows found!")
+        return
+
+    output_filename = f"near_duplicates_{Path(filename).stem}.csv"
+    with open(output_filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['PairId', 'Score', 'Row', 'OriginalRow', 'DifferingColumns'] + fieldnames)
+        for pair_id, (a, b, score, differing) in enumerate(pairs, start=1):
+            diff_text = ', '.join(differing)
+            writer.writerow([pair_id, f'{score:.3f}', a, a, diff_text] + kept[a])
+            writer.writerow([pair_id, f'{score:.3f}', b, a, diff_text] + kept[b])
+
+    print(f"✓ Near-duplicate pairs written to: {output_filename}")
+    print(f"  Total rows in output file: {len(pairs) * 2}\n")
+    for pair_id, (a, b, score, differing) in enumerate(pairs[:20], start=1):
+        print(f"Pair #{pair_id}: Row {b} ~ Row {a}  score {score:.3f}  differs in: {', '.join(differing)}")
+    if len(pairs) > 20:
+        print(f"... {len(pairs) - 20} more in {output_filename}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Find duplicate rows in a CSV file.')
+    parser.add_argument('filename', nargs='?', default='input.csv', help='CSV file to check (default: input.csv)')
+    parser.add_argument('--invoice-column', default='InvNo', help='Invoice column (default: InvNo)')
+    parser.add_argument('--key', action='append', metavar='COLUMN',
+                        help='Column to include in the duplicate key (repeatable, default: all columns)')
+    parser.add_argument('--ignore', action='append', metavar='COLUMN',
+                        help='Column to leave out of the key (repeatable, default: the invoice column)')
+    parser.add_argument('--history', metavar='DB',
+                        help='Check against (and add to) a persistent fingerprint index of prior files')
+    parser.add_argument('--no-record', action='store_true',
+                        help='With --history, check only; do not add this file to the index')
+    parser.add_argument('--near', action='store_true', help='Find near-duplicates instead of exact ones')
+    parser.add_argument('--blocking', choices=['amount', 'minhash', 'both'], default='amount',
+                        help='Near-duplicate blocking: (customer, amount), MinHash over notes, or both')
+    parser.add_argument('--threshold', type=float, default=0.9, help='Minimum near-duplicate score (default: 0.9)')
+    parser.add_argument('--date-tolerance', type=int, default=3,
+                        help='Days within which dates count as partly similar (default: 3)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Processes that parse and digest chunks in parallel (default: 1, inline; '
+                             'not used with --history)')
+    return parser.parse_args()
+
+
 if __name__ == '__main__':
-    filename = sys.argv[1] if len(sys.argv) > 1 else 'input.csv'
-    find_duplicates(filename)
+    args = parse_args()
+    if args.near:
+        find_near_duplicates(args.filename, args.invoice_column, ignore_columns=args.ignore,
+                             blocking=args.blocking, threshold=args.threshold, date_tolerance=args.date_tolerance,
+                             workers=args.workers)
+    elif args.history:
+        find_history_duplicates(args.filename, args.history, args.invoice_column, key_columns=args.key,
+                                ignore_columns=args.ignore, record=not args.no_record)
+    else:
+        find_duplicates(args.filename, args.invoice_column, key_columns=args.key, ignore_columns=args.ignore,
+                        workers=args.workers)
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Ingest a folder of month-end extracts (CSV and Excel) into one SQLite database.
+
+Files are parsed in parallel on a process pool; parsed batches go through a
+queue to a single writer connection, so SQLite only ever sees one writer.
+Each file lands in its own table named after the file and its as-of date
+(e.g. ar_agedinvoicereport_20251231). Report-style exports start with title
+rows (report name, company, date range); the header is taken to be the first
+row that fills most of the columns the top of the file uses. A file is loaded into a staging table
+that replaces the previous table only once the whole file is in, so a file
+that fails to parse (or whose worker dies) leaves the old table in place. A manifest table records each source
+file's SHA-256, and files whose contents have not changed are skipped.
+
+Usage:
+    python ingest_folder.py ../ak-tie-out-2025 --db database.db
+    python ingest_folder.py ../jupyter/aging-artb-recon --workers 4 --force
+"""
+
+import argparse
+import csv
+import hashlib
+import multiprocessing
+import queue as queue_module
+import re
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from itertools import chain, islice
+from pathlib import Path
+
+from csv_to_sqlite import BULK_PRAGMAS, clean_header_names, drop_table
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+MANIFEST_TABLE = '_ingest_manifest'
+EXTENSIONS = ('.csv', '.xlsx')
+BATCH_SIZE = 5000
+QUEUE_BATCHES = 64  # bound on parsed batches waiting for the writer
+POLL_SECONDS = 1.0  # how often the writer checks for dead workers while the queue is empty
+STAGING_SUFFIX = '__loading'
+HEADER_SCAN_ROWS = 50  # rows searched for the header row
+HEADER_FILL = 0.8      # a header fills at least this share of the widest row among them
+
+# As-of dates found in export file names: 12.31.2025, 12.31.25, 2025-12-31, 20251231,
+# and "YE 2025" (year end, December 31) when there is no full date
+DATE_PATTERNS = [
+    (re.compile(r'(?<!\d)(\d{1,2})[._-](\d{1,2})[._-](\d{4})(?!\d)'), ('m', 'd', 'y')),
+    (re.compile(r'(?<!\d)(\d{4})-(\d{2})-(\d{2})(?!\d)'), ('y', 'm', 'd')),
+    (re.compile(r'(?<!\d)(\d{4})(\d{2})(\d{2})(?!\d)'), ('y', 'm', 'd')),
+    (re.compile(r'(?<!\d)(\d{1,2})[._](\d{1,2})[._](\d{2})(?!\d)'), ('m', 'd', 'yy')),
+    (re.compile(r'(?<![0-9A-Za-z])YE[ _-]*(\d{4})(?!\d)', re.IGNORECASE), ('y',)),
+]
+
+
+def as_of_date(path):
+    """Return the as-of date from the file name, else the file's modified date (with a warning)."""
+    for pattern, order in DATE_PATTERNS:
+        for match in pattern.finditer(path.stem):
+            parts = dict(zip(order, match.groups()))
+            year = int(parts['y']) if 'y' in parts else 2000 + int(parts['yy'])
+            try:
+                return date(year, int(parts.get('m', 12)), int(parts.get('d', 31)))
+            except ValueError:
+                continue
+    modified = date.fromtimestamp(path.stat().st_mtime)
+    print(f"Warning: no as-of date in the name of {path.name}; using its modified date {modified:%Y-%m-%d}")
+    return modified
+
+
+def table_name_for(path):
+    """Table name from the file name (dates and noise removed) plus the as-of date."""
+    stem = path.stem
+    for pattern, _ in DATE_PATTERNS:
+        stem = pattern.sub(' ', stem)
+    slug = re.sub(r'[^0-9a-z]+', '_', stem.lower()).strip('_')[:48].rstrip('_') or 'extract'
+    if slug[0].isdigit():
+        slug = f't_{slug}'
+    return f'{slug}_{as_of_date(path):%Y%m%d}'
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def unique_headers(headers):
+    """clean_header_names plus de-duplication (Excel exports often repeat or omit headers)."""
+    seen = {}
+    result = []
+    for header in clean_header_names(headers):
+        count = seen.get(header.lower(), 0)
+        seen[header.lower()] = count + 1
+        result.append(header if count == 0 else f'{header}_{count + 1}')
+    return result
+
+
+def _cell_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ') if value.time() != datetime.min.time() else value.date().isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _iter_csv(path):
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        yield from csv.reader(f)
+
+
+def _iter_xlsx(path):
+    if openpyxl is None:
+        raise RuntimeError('openpyxl is required for .xlsx files (pip install openpyxl)')
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        for values in wb.worksheets[0].iter_rows(values_only=True):
+            yield [_cell_text(v) for v in values]
+    finally:
+        wb.close()
+
+
+def header_index(rows):
+    """Index of the header row: the first row filling HEADER_FILL of the widest row's cells, or None."""
+    filled = [sum(1 for v in row if v.strip()) for row in rows]
+    widest = max(filled, default=0)
+    if not widest:
+        return None
+    return next(i for i, count in enumerate(filled) if count >= HEADER_FILL * widest)
+
+
+def parse_file(path, table_name, queue):
+    """Worker: parse one file and stream its rows to the writer in batches."""
+    try:
+        rows = _iter_xlsx(path) if path.suffix.lower() == '.xlsx' else _iter_csv(path)
+        top = list(islice(rows, HEADER_SCAN_ROWS))
+        at = header_index(top)
+        if at is None:
+            queue.put(('error', str(path), 'no header row found'))
+            return
+        headers = unique_headers(top[at])
+        rows = chain(top[at + 1:], rows)
+        width = len(headers)
+        skipped = sum(1 for row in top[:at] if any(v.strip() for v in row))
+        queue.put(('start', str(path), table_name, headers, skipped))
+
+        padding = [''] * width
+        batch = []
+        for row in rows:
+            if not any(v.strip() for v in row):
+                continue
+            batch.append(row if len(row) == width else (row + padding)[:width])
+            if len(batch) >= BATCH_SIZE:
+                queue.put(('rows', str(path), batch))
+                batch = []
+        if batch:
+            queue.put(('rows', str(path), batch))
+        queue.put(('done', str(path)))
+    except Exception as e:
+        queue.put(('error', str(path), f'{type(e).__name__}: {e}'))
+
+
+def _fail(cursor, message, pending, insert_sql):
+    """Drop a failed file's staging table; its previous table and manifest entry stay as they were."""
+    path = message[1]
+    if path in insert_sql:
+        drop_table(cursor, f'{pending[path][2]}{STAGING_SUFFIX}')
+    print(f"Failed: {Path(path).name}: {message[2]}")
+
+
+def ingest_folder(folder, db_file='database.db', workers=None, force=False):
+    """
+    Ingest every CSV/XLSX file in folder into db_file.
+
+    Args:
+        folder: Directory holding the extracts
+        db_file: Path to the SQLite database file
+        workers: Parser processes (default: CPU count)
+        force: Re-ingest files even if their hash is already in the manifest
+
+    Returns:
+        Dict of source path -> table name for files ingested this run
+    """
+    start = time.perf_counter()
+    folder = Path(folder)
+    files = sorted(p for p in folder.iterdir()
+                   if p.suffix.lower() in EXTENSIONS and not p.name.startswith('~$'))
+
+    conn = sqlite3.connect(db_file, isolation_level=None)
+    cursor = conn.cursor()
+    cursor.execute(f"""CREATE TABLE IF NOT EXISTS {MANIFEST_TABLE} (
+        source_path TEXT PRIMARY KEY, sha256 TEXT, table_name TEXT, rows INTEGER, ingested_at TEXT)""")
+    manifest = {path: sha for path, sha in cursor.execute(f'SELECT source_path, sha256 FROM {MANIFEST_TABLE}')}
+
+    pending = {}
+    used_names = set()
+    for path in files:
+        sha = file_sha256(path)
+        key = str(path.resolve())
+        if not force and manifest.get(key) == sha:
+            print(f"Unchanged, skipping: {path.name}")
+            continue
+        table_name = base_name = table_name_for(path)
+        suffix = 2
+        while table_name in used_names:  # two files that reduce to the same name
+            table_name = f'{base_name}_{suffix}'
+            suffix += 1
+        used_names.add(table_name)
+        pending[str(path)] = (key, sha, table_name)
+
+    if not pending:
+        print("Nothing to ingest.")
+        conn.close()
+        return {}
+
+    saved_pragmas = {name: cursor.execute(f'PRAGMA {name}').fetchone()[0] for name in BULK_PRAGMAS}
+    for name, value in BULK_PRAGMAS.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+    ingested = {}
+    row_counts = {}
+    insert_sql = {}
+    try:
+        cursor.execute('BEGIN')
+        with multiprocessing.Manager() as manager, ProcessPoolExecutor(max_workers=workers) as pool:
+            queue = manager.Queue(maxsize=QUEUE_BATCHES)
+            futures = {path: pool.submit(parse_file, Path(path), table_name, queue)
+                       for path, (_, _, table_name) in pending.items()}
+
+            unfinished = set(pending)
+            while unfinished:
+                try:
+                    message = queue.get(timeout=POLL_SECONDS)
+                except queue_module.Empty:
+                    # Nothing queued: a worker that died (killed, out of memory) never reports back
+                    for path in list(unfinished):
+                        if futures[path].done() and futures[path].exception() is not None:
+                            error = futures[path].exception()
+                            message = ('error', path, f'worker failed: {type(error).__name__}: {error}')
+                            _fail(cursor, message, pending, insert_sql)
+                            unfinished.discard(path)
+                    continue
+                kind, path = message[0], message[1]
+                if path not in unfinished:  # already given up on
+                    continue
+                if kind == 'start':
+                    table_name, headers, skipped = message[2], message[3], message[4]
+                    if skipped:
+                        print(f"Skipped {skipped} title rows above the header in {Path(path).name}")
+                    staging = f'{table_name}{STAGING_SUFFIX}'
+                    drop_table(cursor, staging)
+                    columns_def = ', '.join([f'"{header}" TEXT' for header in headers])
+                    cursor.execute(f'CREATE TABLE "{staging}" ({columns_def})')
+                    insert_sql[path] = f'INSERT INTO "{staging}" VALUES ({", ".join(["?"] * len(headers))})'
+                    row_counts[path] = 0
+                elif kind == 'rows':
+                    cursor.executemany(insert_sql[path], message[2])
+                    row_counts[path] += len(message[2])
+                elif kind == 'done':
+                    key, sha, table_name = pending[path]
+                    drop_table(cursor, table_name)
+                    cursor.execute(f'ALTER TABLE "{table_name}{STAGING_SUFFIX}" RENAME TO "{table_name}"')
+                    cursor.execute(f'INSERT OR REPLACE INTO {MANIFEST_TABLE} VALUES (?, ?, ?, ?, ?)',
+                                   (key, sha, table_name, row_counts[path], datetime.now().isoformat(timespec='seconds')))
+                    ingested[path] = table_name
+                    print(f"Loaded {row_counts[path]:>8} rows  {Path(path).name} -> {table_name}")
+                    unfinished.discard(path)
+                elif kind == 'error':
+                    _fail(cursor, message, pending, insert_sql)
+                    unfinished.discard(path)
+        cursor.execute('COMMIT')
+    except BaseException:
+        if conn.in_transaction:
+            cursor.execute('ROLLBACK')
+        raise
+    finally:
+        for name, value in saved_pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        conn.close()
+
+    elapsed = time.perf_counter() - start
+    total_rows = sum(row_counts.get(p, 0) for p in ingested)
+    print(f"\nIngested {len(ingested)} of {len(files)} files ({total_rows} rows) into {db_file} in {elapsed:.2f}s")
+    return ingested
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Ingest a folder of CSV/XLSX extracts into SQLite.')
+    parser.add_argument('folder', help='Directory holding the extracts')
+    parser.add_argument('--db', default='database.db', help='SQLite database file (default: database.db)')
+    parser.add_argument('--workers', type=int, default=None, help='Parser processes (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='Re-ingest files even if unchanged')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    ingest_folder(args.folder, args.db, workers=args.workers, force=args.force)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Canned reports over the invoices table loaded by csv_to_sqlite.py.
+
+Reports expect the typed schema from `csv_to_sqlite.py --infer-types`
+(Balance_cents INTEGER, ISO InvDueDate). On a table kept current with
+--sync, rows marked _removed_at are left out. Each report has a covering index
+that is created the first time the report runs, the SQL text is fixed and
+parameters are bound, so the connection's statement cache reuses prepared
+statements when several reports run in one session. Results stream out as CSV.
+
+Usage:
+    python invoice_reports.py list
+    python invoice_reports.py open-balance --db database.db --out open_balance.csv
+    python invoice_reports.py past-due --as-of 2025-11-05
+    python invoice_reports.py top-customers --top 25
+    python invoice_reports.py all --out-dir reports/
+    python invoice_reports.py check-plans     # fails if the planner skips a report's covering index
+"""
+
+import argparse
+import csv
+import sqlite3
+import sys
+from datetime import date
+from pathlib import Path
+
+REQUIRED_COLUMNS = ('CusNo', 'CusName', 'InvNo', 'Sts', 'InvDueDate', 'Balance_cents')
+
+# name -> description, covering index columns, SQL ({table} and {live} filled in), parameter names.
+# {live} leaves out rows --sync marked as removed; _removed_at joins the index columns when it exists.
+REPORTS = {
+    'open-balance': (
+        'Open balance by customer',
+        ('CusNo', 'CusName', 'Balance_cents'),
+        """SELECT CusNo, CusName, COUNT(*) AS invoices,
+                  printf('%.2f', SUM(Balance_cents) / 100.0) AS open_balance
+           FROM {table}
+           WHERE {live}
+           GROUP BY CusNo, CusName
+           HAVING SUM(Balance_cents) != 0
+           ORDER BY CusNo""",
+        (),
+    ),
+    'past-due': (
+        'Past-due balance by status (Sts) as of a date (open debit balances only)',
+        ('Sts', 'InvDueDate', 'Balance_cents'),
+        """SELECT Sts, COUNT(*) AS invoices,
+                  printf('%.2f', SUM(Balance_cents) / 100.0) AS past_due_balance,
+                  MIN(InvDueDate) AS oldest_due_date
+           FROM {table}
+           WHERE {live} AND Sts IS NOT NULL AND InvDueDate < :as_of AND Balance_cents > 0
+           GROUP BY Sts
+           ORDER BY Sts""",
+        ('as_of',),
+    ),
+    'duplicate-invno': (
+        'Invoice numbers that appear more than once',
+        ('InvNo', 'CusNo', 'Balance_cents'),
+        """SELECT InvNo, COUNT(*) AS occurrences, COUNT(DISTINCT CusNo) AS customers,
+                  printf('%.2f', SUM(Balance_cents) / 100.0) AS total_balance
+           FROM {table}
+           WHERE {live} AND InvNo IS NOT NULL
+           GROUP BY InvNo
+           HAVING COUNT(*) > 1
+           ORDER BY occurrences DESC, InvNo""",
+        (),
+    ),
+    'top-customers': (
+        'Top N customers by open balance',
+        ('CusNo', 'CusName', 'Balance_cents'),
+        """SELECT CusNo, CusName, COUNT(*) AS invoices,
+                  printf('%.2f', SUM(Balance_cents) / 100.0) AS open_balance
+           FROM {table}
+           WHERE {live}
+           GROUP BY CusNo, CusName
+           ORDER BY SUM(Balance_cents) DESC
+           LIMIT :top""",
+        ('top',),
+    ),
+}
+
+
+def index_name(table_name, columns):
+    return f"rpt_{table_name}_{'_'.join(c.lower() for c in columns)}"
+
+
+class ReportRunner:
+    """One connection for a reporting session; statements are prepared once and reused."""
+
+    def __init__(self, db_file='database.db', table_name='invoices'):
+        self.table_name = table_name
+        self.conn = sqlite3.connect(db_file, cached_statements=256)
+        columns = [r[1] for r in self.conn.execute(f'PRAGMA table_info({table_name})')]
+        missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+        if missing:
+            self.conn.close()
+            raise ValueError(f"{table_name} is missing {', '.join(missing)}; "
+                             f"load it with: python csv_to_sqlite.py <file> --infer-types")
+        self.synced = '_removed_at' in columns
+        self._ensured = set()
+
+    def close(self):
+        self.conn.close()
+
+    def sql(self, name):
+        live = '_removed_at IS NULL' if self.synced else '1'
+        return REPORTS[name][2].format(table=self.table_name, live=live)
+
+    def index_columns(self, name):
+        columns = REPORTS[name][1]
+        return columns + ('_removed_at',) if self.synced else columns
+
+    def ensure_index(self, name):
+        columns = self.index_columns(name)
+        index = index_name(self.table_name, columns)
+        if index not in self._ensured:
+            column_list = ', '.join(f'"{c}"' for c in columns)
+            self.conn.execute(f'CREATE INDEX IF NOT EXISTS "{index}" ON {self.table_name} ({column_list})')
+            self.conn.commit()
+            self._ensured.add(index)
+
+    def run(self, name, params):
+        """Return (header, row iterator) for a report; rows are fetched lazily."""
+        self.ensure_index(name)
+        bound = {p: params[p] for p in REPORTS[name][3]}
+        cursor = self.conn.execute(self.sql(name), bound)
+        return [d[0] for d in cursor.description], cursor
+
+    def plan(self, name, params):
+        self.ensure_index(name)
+        bound = {p: params[p] for p in REPORTS[name][3]}
+        return [row[3] for row in self.conn.execute(f'EXPLAIN QUERY PLAN {self.sql(name)}', bound)]
+
+    def check_plans(self, params):
+        """Return {report: plan lines} for reports the planner does not answer from their covering index."""
+        failures = {}
+        for name in REPORTS:
+            lines = self.plan(name, params)
+            covering = f'COVERING INDEX {index_name(self.table_name, self.index_columns(name))}'
+            ok = any(covering in line for line in lines)
+            if not ok:
+                failures[name] = lines
+            print(f"{'ok  ' if ok else 'FAIL'}  {name}: {' | '.join(lines)}")
+        return failures
+
+
+def write_report(runner, name, params, out):
+    header, rows = runner.run(name, params)
+    writer = csv.writer(out)
+    writer.writerow(header)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Run canned reports over the loaded invoices table.')
+    parser.add_argument('report', choices=sorted(REPORTS) + ['all', 'list', 'check-plans'],
+                        help='Report to run, or all / list / check-plans')
+    parser.add_argument('--db', default='database.db', help='SQLite database file (default: database.db)')
+    parser.add_argument('--table', default='invoices', help='Table name (default: invoices)')
+    parser.add_argument('--as-of', default=date.today().isoformat(),
+                        help='As-of date for past-due, YYYY-MM-DD (default: today)')
+    parser.add_argument('--top', type=int, default=10, help='N for top-customers (default: 10)')
+    parser.add_argument('--out', help='Output CSV for a single report (default: stdout)')
+    parser.add_argument('--out-dir', default='.', help='Output directory for "all" (default: current directory)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.report == 'list':
+        for name, (description, columns, _, _) in REPORTS.items():
+            print(f"{name:16} {description}  [index: {', '.join(columns)}]")
+        return 0
+
+    params = {'as_of': date.fromisoformat(args.as_of).isoformat(), 'top': args.top}
+    runner = ReportRunner(args.db, args.table)
+    try:
+        if args.report == 'check-plans':
+            return 1 if runner.check_plans(params) else 0
+
+        if args.report == 'all':
+            out_dir = Path(args.out_dir)
+            out_dir.mkdir(parents=True, exist_ok=True)
+            for name in REPORTS:
+                path = out_dir / f'{name}.csv'
+                with open(path, 'w', newline='', encoding='utf-8') as f:
+                    count = write_report(runner, name, params, f)
+                print(f"{name}: {count} rows -> {path}")
+            return 0
+
+        if args.out:
+            with open(args.out, 'w', newline='', encoding='utf-8') as f:
+                count = write_report(runner, args.report, params, f)
+            print(f"{args.report}: {count} rows -> {args.out}")
+        else:
+            write_report(runner, args.report, params, sys.stdout)
+        return 0
+    finally:
+        runner.close()
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
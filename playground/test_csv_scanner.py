@@ -0,0 +1,90 @@
+"""CSVScanner must read exactly what csv.reader reads, whatever the chunk size.
+
+Run with: python -m pytest playground/test_csv_scanner.py
+"""
+
+import csv
+import io
+
+import pytest
+
+from csv_scanner import CSVScanner, _drain
+
+CHUNK_SIZES = [16, 64, 97, 4096, 1024 * 1024]
+
+HEADER = 'CusNo,InvNo,Item,Notes\r\n'
+
+CLEAN_ROWS = [
+    'C001,1001,Widget,plain\r\n',
+    'C002,1002,"Bolt, hex","said ""call back""\r\nnext week"\r\n',
+    '\r\n',
+    'C003,1003,Nut,"multi\nline\nnote"\r\n',
+    'C004,1004,"",\r\n',
+    'C005,1005,Washer,"ends with quote """\r\n',
+]
+
+BARE_ROWS = [
+    'C010,2001,Pipe 12",next\r\n',
+    'C011,2002,"Pipe, 3/4","odd\r\n,quote"\r\n',
+    'C012,2003,Pipe 12"x,note\r\n',
+    'C013,2004,Rod 6",\r\n',
+    'C014,2005,Cap,"closed ""here"""\r\n',
+]
+
+ONE_LINE_ROWS = [
+    'C020,3001,Widget,plain\r\n',
+    '\r\n',
+    'C021,3002,"Bolt, hex","said ""call back"""\r\n',
+    'C022,3003\r\n',
+    'C023,3004,Nut,,extra\r\n',
+    ' \r\n',
+]
+
+
+def expected_rows(text, width):
+    """What csv.reader (and so csv.DictReader) makes of the data rows, padded to width."""
+    reader = csv.reader(io.StringIO(text, newline=''))
+    next(reader)
+    return [tuple((row + [''] * width)[:width]) for row in reader if row]
+
+
+def write_csv(tmp_path, rows, repeat=30):
+    text = HEADER + ''.join(rows) * repeat
+    path = tmp_path / 'input.csv'
+    path.write_bytes(text.encode('utf-8'))
+    return path, text
+
+
+@pytest.mark.parametrize('chunk_bytes', CHUNK_SIZES)
+@pytest.mark.parametrize('rows, splittable', [(CLEAN_ROWS, True), (BARE_ROWS, False),
+                                              (CLEAN_ROWS + BARE_ROWS + CLEAN_ROWS, False)])
+def test_rows_match_csv_reader(tmp_path, chunk_bytes, rows, splittable):
+    path, text = write_csv(tmp_path, rows)
+    with CSVScanner(path, delimiter=',', chunk_bytes=chunk_bytes) as scanner:
+        expected = expected_rows(text, scanner.width)
+        assert scanner.splittable is splittable
+        assert list(scanner.rows()) == expected
+        assert sum(count for _, count, _ in scanner.map(_drain)) == len(expected)
+
+
+@pytest.mark.parametrize('chunk_bytes', CHUNK_SIZES)
+def test_bare_quote_ending_a_field(tmp_path, chunk_bytes):
+    # Only bare quotes right before a delimiter or newline: the case quote counting misses
+    rows = ['C%03d,%d,Pipe %d",x\r\n' % (i, 3000 + i, i) for i in range(50)]
+    path, text = write_csv(tmp_path, rows, repeat=1)
+    with CSVScanner(path, delimiter=',', chunk_bytes=chunk_bytes) as scanner:
+        assert not scanner.splittable
+        assert list(scanner.rows()) == expected_rows(text, scanner.width)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+@pytest.mark.parametrize('chunk_bytes', CHUNK_SIZES)
+@pytest.mark.parametrize('rows', [CLEAN_ROWS, CLEAN_ROWS + BARE_ROWS, ONE_LINE_ROWS])
+def test_rows_at_matches_full_pass(tmp_path, chunk_bytes, rows, workers):
+    path, text = write_csv(tmp_path, rows)
+    with CSVScanner(path, delimiter=',', chunk_bytes=chunk_bytes) as scanner:
+        expected = dict(enumerate(expected_rows(text, scanner.width), start=2))
+        wanted = [2, 5, 17, len(expected) + 1, len(expected) + 50]
+        assert scanner.rows_at(wanted) == {n: expected[n] for n in wanted if n in expected}
+        assert sum(count for _, count, _ in scanner.map(_drain, workers=workers)) == len(expected)
+        assert scanner.rows_at(wanted) == {n: expected[n] for n in wanted if n in expected}
@@ -0,0 +1,104 @@
+"""Loading and syncing extracts: blank ",,,," rows, number formats and typed columns.
+
+Run with: python -m pytest playground/test_csv_to_sqlite.py
+"""
+
+import sqlite3
+from argparse import Namespace
+
+import pytest
+
+from csv_to_sqlite import (build_notes_index, import_csv_to_sqlite, infer_column_types, run_search,
+                           search_notes, sync_csv_to_sqlite)
+
+HEADER = 'CusNo,InvNo,Balance,Comment\r\n'
+ROWS = [
+    '0000048,S1001,"1,000.00",first\r\n',
+    '0000048,S1002,539.50,\r\n',
+    '0000051,S1003,12.00,call back\r\n',
+]
+BLANK_ROWS = [',,,\r\n', '\r\n', ',,,\r\n', ' , ,,\r\n']
+
+
+def write_csv(path, rows):
+    path.write_text(HEADER + ''.join(rows), encoding='utf-8', newline='')
+    return str(path)
+
+
+def keyed_rows(db_file):
+    with sqlite3.connect(db_file) as conn:
+        return conn.execute('SELECT _row_key, _removed_at FROM invoices WHERE _row_key IS NOT NULL '
+                            'ORDER BY _row_key').fetchall()
+
+
+@pytest.mark.parametrize('preload', [None, 'text', 'typed'])
+def test_sync_skips_blank_rows(tmp_path, preload):
+    csv_file = write_csv(tmp_path / 'extract.csv', ROWS + BLANK_ROWS)
+    db_file = str(tmp_path / 'test.db')
+    if preload:
+        import_csv_to_sqlite(csv_file, db_file, infer_types=preload == 'typed')
+
+    counts = sync_csv_to_sqlite(csv_file, db_file)
+    assert counts['insert'] + counts['update'] == len(ROWS)
+    assert keyed_rows(db_file) == [('0000048|S1001', None), ('0000048|S1002', None), ('0000051|S1003', None)]
+
+    # Dropping a row and syncing again still ignores the blank rows
+    counts = sync_csv_to_sqlite(write_csv(tmp_path / 'next.csv', ROWS[1:] + BLANK_ROWS), db_file)
+    assert counts == {'insert': 0, 'update': 0, 'restore': 0, 'remove': 1, 'unchanged': 2}
+    assert [key for key, removed_at in keyed_rows(db_file) if removed_at] == ['0000048|S1001']
+
+
+@pytest.mark.parametrize('values, kind', [
+    (['1,000', '12,345,678', '-2,500'], 'integer'),
+    (['1,000.50', '$2,500.00', '(1,234.56)'], 'money'),
+    (['3,45', '1,00'], 'text'),        # decimal commas are not thousands separators
+    (['1,2,3', '12,34,567'], 'text'),
+])
+def test_commas_only_as_thousands_separators(values, kind):
+    assert infer_column_types([(v,) for v in values]) == [kind]
+
+
+def test_typed_load_skips_blank_rows(tmp_path):
+    csv_file = write_csv(tmp_path / 'extract.csv', ROWS + BLANK_ROWS)
+    db_file = str(tmp_path / 'test.db')
+    assert import_csv_to_sqlite(csv_file, db_file, infer_types=True) == len(ROWS)
+
+
+def test_indexed_integer_column_moves_to_cents_on_sync(tmp_path):
+    db_file = str(tmp_path / 'test.db')
+    header = 'CusNo,InvNo,Qty,Comment\r\n'
+    whole = tmp_path / 'whole.csv'
+    whole.write_text(header + '0000048,S1001,10,first\r\n0000048,S1002,2,\r\n', encoding='utf-8', newline='')
+    import_csv_to_sqlite(str(whole), db_file, index_columns=['Qty'], infer_types=True)
+
+    cents = tmp_path / 'cents.csv'
+    cents.write_text(header + '0000048,S1001,10,first\r\n0000048,S1002,2,\r\n0000051,S1003,1.50,\r\n',
+                     encoding='utf-8', newline='')
+    assert sync_csv_to_sqlite(str(cents), db_file)['insert'] == 1
+    with sqlite3.connect(db_file) as conn:
+        assert conn.execute('SELECT Qty_cents FROM invoices ORDER BY InvNo').fetchall() == [(1000,), (200,), (150,)]
+        assert [r[2] for r in conn.execute('PRAGMA index_info("idx_invoices_Qty")')] == ['Qty_cents']
+
+
+def test_sync_keeps_notes_index_without_rebuilding(tmp_path, capsys):
+    db_file = str(tmp_path / 'test.db')
+    import_csv_to_sqlite(write_csv(tmp_path / 'extract.csv', ROWS), db_file)
+    assert build_notes_index(db_file) == ['Comment']
+
+    changed = [ROWS[0], '0000048,S1002,539.50,disputed by phone\r\n', ROWS[2]]
+    sync_csv_to_sqlite(write_csv(tmp_path / 'next.csv', changed), db_file)
+    assert build_notes_index(db_file) == ['Comment']
+    assert 'not rebuilt' in capsys.readouterr().out
+    assert [m['InvNo'] for m in search_notes('dispute*', db_file)] == ['S1002']
+
+
+def test_search_reports_bad_query(tmp_path, capsys):
+    db_file = str(tmp_path / 'test.db')
+    import_csv_to_sqlite(write_csv(tmp_path / 'extract.csv', ROWS), db_file)
+    build_notes_index(db_file)
+    capsys.readouterr()
+
+    run_search(Namespace(search='call-back', db=db_file, table='invoices', limit=20))
+    assert capsys.readouterr().out.startswith("Error: could not run search 'call-back'")
+    run_search(Namespace(search='"call-back"', db=db_file, table='invoices', limit=20))
+    assert '   1.  0000051 S1003  [call back]' in capsys.readouterr().out
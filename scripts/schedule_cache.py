@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""Memoize amortization schedules keyed by normalized loan terms.
+
+Month-end jobs reprocess the same loan book over and over. This module puts a
+cache in front of both schedule engines:
+
+- "decimal": build_schedule() in amortization-table.py (supports extra principal)
+- "float":   amortization_schedule() in scripts/amortization_table.py (supports start date)
+
+Lookups go through an in-process LRU first, then an optional on-disk store of
+compact array-backed schedules (one file per key, least recently used files are
+evicted once the store grows past a size limit). Only misses run the engine.
+
+Usage example:
+    python scripts/schedule_cache.py loans.csv --engine float --cache-dir .schedule_cache
+
+The loan book CSV needs principal, apr and term_months columns; extra_principal,
+start_date and loan_id are optional.
+"""
+
+from __future__ import annotations
+
+import argparse
+import array
+import csv
+import datetime as dt
+import hashlib
+import importlib.util
+import json
+import os
+import struct
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal
+from pathlib import Path
+from typing import Optional
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+CENT = Decimal("0.01")
+
+ENGINES = ("decimal", "float")
+
+# Numeric columns stored for each engine, in output order.
+DECIMAL_COLUMNS = ["Period", "Payment", "Interest", "Principal", "ExtraPrincipal", "TotalPrincipal", "Balance"]
+FLOAT_COLUMNS = ["payment_number", "payment_amount", "principal_paid", "interest_paid", "remaining_balance"]
+
+
+
+def _load_module(name: str, path: Path):
+    """Import a file by path, once.
+
+    scripts/ is not a package, so a plain import of a sibling only works when
+    scripts/ is on sys.path; amortization-table.py has a hyphen in its name.
+    """
+    module = sys.modules.get(name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+amortization_table = _load_module("amortization_table", SCRIPTS_DIR / "amortization_table.py")
+
+
+def _load_decimal_engine():
+    """Import amortization-table.py (the hyphenated name rules out a plain import)."""
+    return _load_module("amortization_table_decimal", SCRIPTS_DIR.parent / "amortization-table.py")
+
+
+@dataclass(frozen=True)
+class LoanTerms:
+    principal: Decimal
+    apr: Decimal                # percent, e.g. 6.5 for 6.5%
+    term_months: int
+    extra_principal: Decimal = Decimal("0")
+    start_date: Optional[dt.date] = None
+    engine: str = "decimal"
+
+    def normalized(self) -> "LoanTerms":
+        """The terms as the engine sees them: amounts in whole cents, and only the inputs it uses.
+
+        The decimal engine ignores the start date, so it is dropped there.
+        Amounts are rounded the way the decimal engine rounds money.
+        """
+        return LoanTerms(
+            principal=Decimal(self.principal).quantize(CENT, rounding=ROUND_HALF_UP),
+            apr=Decimal(self.apr).normalize(),
+            term_months=int(self.term_months),
+            extra_principal=Decimal(self.extra_principal).quantize(CENT, rounding=ROUND_HALF_UP),
+            start_date=self.start_date if self.engine == "float" else None,
+            engine=self.engine,
+        )
+
+    def key(self) -> str:
+        """Cache key of the normalized terms; loans that get the same schedule produce equal keys."""
+        terms = self.normalized()
+        parts = [
+            terms.engine,
+            f"{terms.principal}",
+            f"{terms.apr:f}",
+            str(terms.term_months),
+            f"{terms.extra_principal}",
+            terms.start_date.isoformat() if terms.start_date else "",
+        ]
+        return "|".join(parts)
+
+
+@dataclass
+class CompactSchedule:
+    """A schedule stored column-wise as arrays of doubles."""
+
+    engine: str
+    start_date: Optional[dt.date]
+    columns: dict[str, array.array]
+
+    @classmethod
+    def from_rows(cls, terms: LoanTerms, rows: list[dict]) -> "CompactSchedule":
+        names = DECIMAL_COLUMNS if terms.engine == "decimal" else FLOAT_COLUMNS
+        columns = {name: array.array("d", (float(r[name]) for r in rows)) for name in names}
+        return cls(engine=terms.engine, start_date=terms.start_date, columns=columns)
+
+    def to_rows(self) -> list[dict]:
+        n = len(next(iter(self.columns.values()), []))
+        rows: list[dict] = []
+        if self.engine == "decimal":
+            for i in range(n):
+                row = {name: self.columns[name][i] for name in DECIMAL_COLUMNS}
+                row["Period"] = int(row["Period"])
+                rows.append(row)
+            return rows
+
+        for i in range(n):
+            number = int(self.columns["payment_number"][i])
+            payment_date = ""
+            if self.start_date:
+                payment_date = amortization_table.add_months(self.start_date, number - 1).isoformat()
+            rows.append(
+                {
+                    "payment_number": f"{number}",
+                    "payment_date": payment_date,
+                    "payment_amount": f"{self.columns['payment_amount'][i]:.2f}",
+                    "principal_paid": f"{self.columns['principal_paid'][i]:.2f}",
+                    "interest_paid": f"{self.columns['interest_paid'][i]:.2f}",
+                    "remaining_balance": f"{self.columns['remaining_balance'][i]:.2f}",
+                }
+            )
+        return rows
+
+    def to_bytes(self) -> bytes:
+        header = json.dumps(
+            {
+                "engine": self.engine,
+                "start_date": self.start_date.isoformat() if self.start_date else None,
+                "columns": list(self.columns),
+                "rows": len(next(iter(self.columns.values()), [])),
+            }
+        ).encode("utf-8")
+        body = b"".join(col.tobytes() for col in self.columns.values())
+        return struct.pack("<I", len(header)) + header + body
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CompactSchedule":
+        (header_len,) = struct.unpack_from("<I", data)
+        header = json.loads(data[4:4 + header_len].decode("utf-8"))
+        offset = 4 + header_len
+        width = header["rows"] * array.array("d").itemsize
+        columns = {}
+        for name in header["columns"]:
+            col = array.array("d")
+            col.frombytes(data[offset:offset + width])
+            columns[name] = col
+            offset += width
+        start = dt.date.fromisoformat(header["start_date"]) if header["start_date"] else None
+        return cls(engine=header["engine"], start_date=start, columns=columns)
+
+
+class DiskStore:
+    """Directory of compact schedules with least-recently-used eviction by total size.
+
+    File sizes are tracked in memory, oldest use first, so put() does not have
+    to walk the directory; it is only rescanned when the total goes over
+    max_bytes, and eviction then frees down to EVICT_TO of the limit so the
+    next rescan is a while off.
+    """
+
+    EVICT_TO = 0.9
+
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._sizes: OrderedDict[str, int] = OrderedDict()
+        self.total_bytes = 0
+        self._scan()
+
+    def _scan(self) -> None:
+        """Rebuild the size index from the directory, least recently used first."""
+        entries = []
+        for path in self.directory.glob("*.sched"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, path.name, stat.st_size))
+        self._sizes = OrderedDict((name, size) for _, name, size in sorted(entries))
+        self.total_bytes = sum(self._sizes.values())
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.sched"
+
+    def _touch(self, name: str, size: int) -> None:
+        self.total_bytes += size - self._sizes.pop(name, 0)
+        self._sizes[name] = size
+
+    def get(self, key: str) -> Optional[CompactSchedule]:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        os.utime(path)  # mark as recently used
+        self._touch(path.name, len(data))
+        return CompactSchedule.from_bytes(data)
+
+    def put(self, key: str, schedule: CompactSchedule) -> None:
+        path = self._path(key)
+        data = schedule.to_bytes()
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        self._touch(path.name, len(data))
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> None:
+        # Rescan first: another process may share the directory
+        self._scan()
+        target = self.max_bytes * self.EVICT_TO
+        while self.total_bytes > target and self._sizes:
+            name, size = self._sizes.popitem(last=False)
+            (self.directory / name).unlink(missing_ok=True)
+            self.total_bytes -= size
+
+
+class ScheduleCache:
+    """In-process LRU in front of an optional DiskStore in front of the schedule engines."""
+
+    def __init__(self, maxsize: int = 1024, disk: Optional[DiskStore] = None) -> None:
+        self.maxsize = maxsize
+        self.disk = disk
+        self._lru: OrderedDict[str, CompactSchedule] = OrderedDict()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.memory_hits + self.disk_hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return (self.memory_hits + self.disk_hits) / self.lookups if self.lookups else 0.0
+
+    def _remember(self, key: str, schedule: CompactSchedule) -> None:
+        self._lru[key] = schedule
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
+
+    def schedule(self, terms: LoanTerms) -> list[dict]:
+        """Return the schedule rows for `terms`, exactly as the chosen engine would for terms.normalized()."""
+        terms = terms.normalized()
+        key = terms.key()
+
+        cached = self._lru.get(key)
+        if cached is not None:
+            self._lru.move_to_end(key)
+            self.memory_hits += 1
+            return cached.to_rows()
+
+        if self.disk is not None:
+            cached = self.disk.get(key)
+            if cached is not None:
+                self.disk_hits += 1
+                self._remember(key, cached)
+                return cached.to_rows()
+
+        self.misses += 1
+        rows = _run_engine(terms)
+        compact = CompactSchedule.from_rows(terms, rows)
+        self._remember(key, compact)
+        if self.disk is not None:
+            self.disk.put(key, compact)
+        return rows
+
+    def report(self) -> str:
+        return (
+            f"Lookups: {self.lookups}  memory hits: {self.memory_hits}  "
+            f"disk hits: {self.disk_hits}  misses: {self.misses}  hit rate: {self.hit_rate:.1%}"
+        )
+
+
+def _run_engine(terms: LoanTerms) -> list[dict]:
+    if terms.engine == "decimal":
+        module = _load_decimal_engine()
+        inputs = module.LoanInputs(
+            principal=Decimal(terms.principal),
+            annual_rate=Decimal(terms.apr) / Decimal("100"),
+            term_months=terms.term_months,
+            extra_principal=Decimal(terms.extra_principal),
+        )
+        return module.build_schedule(inputs)
+
+    if terms.engine == "float":
+        if Decimal(terms.extra_principal) != 0:
+            raise ValueError("The float engine does not support extra principal")
+        inputs = amortization_table.LoanInputs(
+            principal=float(terms.principal),
+            annual_rate=float(terms.apr),
+            term_months=terms.term_months,
+            start_date=terms.start_date,
+        )
+        return list(amortization_table.amortization_schedule(inputs))
+
+    raise ValueError(f"Unknown engine: {terms.engine!r} (expected one of {ENGINES})")
+
+
+def read_loan_book(path: str, engine: str) -> list[tuple[str, LoanTerms]]:
+    loans = []
+    with open(path, newline="", encoding="utf-8") as file:
+        for line_num, row in enumerate(csv.DictReader(file), start=2):
+            start = (row.get("start_date") or "").strip()
+            terms = LoanTerms(
+                principal=Decimal(row["principal"].replace(",", "")),
+                apr=Decimal(row["apr"]),
+                term_months=int(row["term_months"]),
+                extra_principal=Decimal((row.get("extra_principal") or "0").replace(",", "") or "0"),
+                start_date=dt.date.fromisoformat(start) if start else None,
+                engine=engine,
+            )
+            loans.append((row.get("loan_id") or f"row{line_num}", terms))
+    return loans
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate schedules for a loan book through the schedule cache.")
+    parser.add_argument("loan_book", help="CSV with principal, apr, term_months[, extra_principal, start_date, loan_id]")
+    parser.add_argument("--engine", choices=ENGINES, default="decimal", help="Schedule engine (default: decimal)")
+    parser.add_argument("--cache-dir", type=str, help="Directory for the on-disk schedule store (default: memory only)")
+    parser.add_argument("--max-mb", type=float, default=64, help="Size limit for the on-disk store in MB (default: 64)")
+    parser.add_argument("--lru-size", type=int, default=1024, help="In-process LRU entries (default: 1024)")
+    parser.add_argument("--output-dir", type=str, help="Optional directory to write one schedule CSV per loan")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    disk = DiskStore(Path(args.cache_dir), int(args.max_mb * 1024 * 1024)) if args.cache_dir else None
+    cache = ScheduleCache(maxsize=args.lru_size, disk=disk)
+
+    out_dir = Path(args.output_dir) if args.output_dir else None
+    if out_dir:
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+    for loan_id, terms in read_loan_book(args.loan_book, args.engine):
+        rows = cache.schedule(terms)
+        if out_dir:
+            _write_rows(rows, out_dir / f"{loan_id}.csv")
+
+    print(cache.report())
+
+
+def _write_rows(rows: list[dict], path: Path) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0].keys()) if rows else [])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main()